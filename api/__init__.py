@@ -1,10 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from api.admin import admin_router
 from api.user import user_router
-from api.auth import auth_router
+from api.auth import auth_router, jwks_router, jwt_service
+from api.auth.fast_verify import FastVerifyMiddleware
+from api.health import health_router
+from api.load_shedding import LoadSheddingMiddleware, concurrency_limiters
+from api.metrics import MetricsMiddleware, metrics_router
 
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.auth.generate_password import password_hasher
+from api.auth.revocation import revocation_store
+from api.user.bulk import shutdown_hash_executor
+from core.db.session import (
+    dispose_engine,
+    get_engine,
+    get_replicas,
+    get_session_factory,
+)
+from core.config import settings
+from core.fastapi.responses import FastJSONResponse
+from core.metrics import registry
+
+
+@asynccontextmanager
+async def lifespan(api: FastAPI):
+    get_engine()
+    background = [
+        asyncio.create_task(revocation_store.run_sync(get_session_factory()))
+    ]
+    replicas = get_replicas()
+    if replicas is not None:
+        background.append(
+            asyncio.create_task(
+                replicas.run_health_checks(
+                    settings.db.replica_check_seconds,
+                    settings.db.replica_check_timeout_seconds,
+                )
+            )
+        )
+    api.state.ready = True
+    yield
+    api.state.ready = False
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await dispose_engine()
+    password_hasher.shutdown()
+    jwt_service.shutdown()
+    shutdown_hash_executor()
+
 
 def init_cors(api: FastAPI) -> None:
     api.add_middleware(
@@ -16,9 +66,29 @@ def init_cors(api: FastAPI) -> None:
     )
 
 
+def init_metrics(api: FastAPI) -> None:
+    if not registry.enabled:
+        return
+    api.add_middleware(MetricsMiddleware)
+    api.include_router(metrics_router)
+
+
+def init_fast_verify(api: FastAPI) -> None:
+    if settings.auth_jwt.fast_verify:
+        api.add_middleware(FastVerifyMiddleware, jwt_service=jwt_service)
+
+
+def init_load_shedding(api: FastAPI) -> None:
+    if settings.load_shedding.enabled:
+        api.add_middleware(LoadSheddingMiddleware, limiters=concurrency_limiters)
+
+
 def init_routers(api: FastAPI) -> None:
     api.include_router(user_router)
     api.include_router(auth_router)
+    api.include_router(jwks_router)
+    api.include_router(admin_router)
+    api.include_router(health_router)
 
 
 def create_api() -> FastAPI:
@@ -28,10 +98,17 @@ def create_api() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
 
     init_routers(api=api)
+    # Middleware added later wraps the earlier ones: load shedding runs
+    # inside CORS and metrics, so its 503/504 responses get both.
+    init_load_shedding(api=api)
     init_cors(api=api)
+    init_metrics(api=api)
+    init_fast_verify(api=api)
 
     return api
 
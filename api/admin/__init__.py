@@ -0,0 +1,71 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.user.bulk import FORMATS, aiter_lines, export_users, import_users
+from api.user.dto import UserImportResultDTO
+from core.config import settings
+from core.db.session import get_db_session, get_session_factory
+
+
+def verify_admin_token(x_admin_token: str | None = Header(None)) -> None:
+    admin_token = settings.bulk.admin_token
+    if admin_token is None:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            {"error_message": "Admin API is disabled", "error_code": 1},
+        )
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            {"error_message": "Forbidden. Invalid admin token.", "error_code": 2},
+        )
+
+
+admin_router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(verify_admin_token)],
+)
+
+
+@admin_router.post(
+    "/users/import",
+    response_model=UserImportResultDTO,
+    responses={
+        200: {"description": "Users imported."},
+        403: {"description": "Forbidden. Invalid admin token."},
+        422: {"description": "Unsupported format."},
+    },
+)
+async def import_users_route(
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+    format: str = Query("ndjson", enum=list(FORMATS)),
+):
+    """
+    Import users. The operation streams NDJSON or CSV records with email, username and password or bcrypt password_hash.
+    """
+    return await import_users(session, aiter_lines(request.stream()), format)
+
+
+@admin_router.get(
+    "/users/export",
+    responses={
+        200: {"description": "NDJSON stream of users."},
+        403: {"description": "Forbidden. Invalid admin token."},
+    },
+)
+async def export_users_route():
+    """
+    Export users. The operation streams all users as NDJSON, password hashes included.
+    """
+
+    async def stream():
+        async with get_session_factory()() as session:
+            async for chunk in export_users(session):
+                yield chunk
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
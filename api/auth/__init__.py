@@ -1,27 +1,137 @@
+import hashlib
+import math
+import secrets
+import uuid
+from datetime import datetime, timedelta
 from typing import Annotated
-from fastapi import APIRouter, Response, Depends, HTTPException, status
+from fastapi import APIRouter, Request, Response, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from core.config import settings
 from core.fastapi.dependencies import get_repository
+from core.fastapi.responses import FastJSONResponse
+from core.metrics import PASSWORD_REHASHES
+from core.rate_limit import (
+    LocalRateLimitBackend,
+    RateLimiter,
+    client_address,
+    parse_networks,
+)
 
-from .dto import TokenResponseDTO, TokenRequestDTO
+from .dto import (
+    RefreshTokenRequestDTO,
+    TokenBatchRequestDTO,
+    TokenBatchResponseDTO,
+    TokenRequestDTO,
+    TokenResponseDTO,
+    TokenVerificationDTO,
+)
 from core.db.repository import DatabaseRepository
-from app.models.user import User
-from api.auth.generate_password import validate_password
+from app.models.refresh_token import RefreshToken
+from app.models.user import User, credentials_query
+from api.auth.generate_password import (
+    PasswordHasherBusy,
+    needs_rehash,
+    password_hasher,
+)
 from api.auth.generate_token import JWTService
+from api.auth.revocation import revocation_store
 
 
-jwt_service = JWTService()
+jwt_service = JWTService(revocations=revocation_store)
 
 http_bearer_scheme = HTTPBearer()
 
+trusted_proxies = parse_networks(settings.rate_limit.trusted_proxies)
+rate_limit_backend = LocalRateLimitBackend(settings.rate_limit.max_keys)
+login_ip_limiter = RateLimiter(
+    rate_limit_backend,
+    "login_ip",
+    settings.rate_limit.login_ip_per_minute,
+    settings.rate_limit.login_ip_burst,
+)
+login_email_limiter = RateLimiter(
+    rate_limit_backend,
+    "login_email",
+    settings.rate_limit.login_email_per_minute,
+    settings.rate_limit.login_email_burst,
+)
+
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
+jwks_router = APIRouter(tags=["auth"])
+
 UserRepository = Annotated[
     DatabaseRepository[User],
     Depends(get_repository(User)),
 ]
 
+RefreshTokenRepository = Annotated[
+    DatabaseRepository[RefreshToken],
+    Depends(get_repository(RefreshToken)),
+]
+
+
+async def check_login_rate_limit(client_ip: str, email: str) -> None:
+    """
+    Отклоняем попытку входа до запроса в БД и проверки пароля, если для IP
+    или почты превышен лимит.
+    """
+    if not settings.rate_limit.enabled:
+        return
+
+    retry_after = await login_ip_limiter.hit(client_ip)
+    if not retry_after:
+        retry_after = await login_email_limiter.hit(email)
+    if retry_after:
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            {"error_message": "Too many login attempts.", "error_code": 5},
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+async def upgrade_password_hash(
+    user_repo: DatabaseRepository[User], user_id: uuid.UUID, password: str
+) -> None:
+    """
+    Перехешируем пароль по текущей политике после успешного входа. Если пул
+    хеширования занят, хеш обновится при одном из следующих входов.
+    """
+    try:
+        password_hash = await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        return
+    if await user_repo.update(user_id, password_hash=password_hash):
+        PASSWORD_REHASHES.inc(settings.password.scheme)
+
+
+def hash_refresh_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+async def issue_tokens(
+    token_repo: DatabaseRepository[RefreshToken], user_id: uuid.UUID
+) -> TokenResponseDTO:
+    """
+    Выпускаем короткоживущий access токен и одноразовый refresh токен.
+    """
+    refresh_token = secrets.token_urlsafe(32)
+    await token_repo.create(
+        {
+            "user_id": user_id,
+            "token_hash": hash_refresh_token(refresh_token),
+            "expires_at": datetime.now()
+            + timedelta(days=settings.auth_jwt.refresh_token_expire_days),
+        }
+    )
+    return TokenResponseDTO(
+        access_token=jwt_service.encode_jwt({"sub": str(user_id)}),
+        token_type="bearer",
+        refresh_token=refresh_token,
+        expires_in=jwt_service.access_token_expire_minutes * 60,
+    )
+
 
 @auth_router.post(
     "/token",
@@ -29,17 +139,28 @@ UserRepository = Annotated[
     responses={
         200: {"description": "Token generated successfully."},
         403: {"description": "Forbidden. Invalid credentials."},
+        429: {"description": "Too many login attempts. Retry later."},
+        503: {"description": "Service busy. Retry later."},
         500: {"description": "Server error. Unable to generate token."},
     },
 )
 async def get_token_route(
     request: TokenRequestDTO,
     user_repo: UserRepository,
+    token_repo: RefreshTokenRepository,
+    http_request: Request,
 ):
     """
-    Get token. The operation returns JWT token.
+    Get token. The operation returns short-lived JWT access token and refresh token.
     """
-    users = await user_repo.filter(User.email == request.email)
+    client_ip = client_address(
+        http_request.client.host if http_request.client else None,
+        http_request.headers.get("x-forwarded-for"),
+        trusted_proxies,
+    )
+    await check_login_rate_limit(client_ip, request.email)
+
+    users = await user_repo.execute(credentials_query(request.email))
     if not users:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
@@ -48,11 +169,13 @@ async def get_token_route(
     user = users[0]
 
     try:
-        if not validate_password(request.password, user.password_hash):
-            raise HTTPException(
-                status.HTTP_403_FORBIDDEN,
-                {"error_message": "Forbidden. Invalid credentials.", "error_code": 2},
-            )
+        is_valid = await password_hasher.validate(request.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"error_message": "Service busy. Retry later.", "error_code": 4},
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
@@ -62,8 +185,43 @@ async def get_token_route(
             },
         )
 
-    token = jwt_service.encode_jwt({"sub": str(user.id)})
-    return TokenResponseDTO(access_token=token, token_type="bearer")
+    if not is_valid:
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            {"error_message": "Forbidden. Invalid credentials.", "error_code": 2},
+        )
+
+    if needs_rehash(user.password_hash):
+        await upgrade_password_hash(user_repo, user.id, request.password)
+
+    return FastJSONResponse(await issue_tokens(token_repo, user.id))
+
+
+@auth_router.post(
+    "/refresh",
+    response_model=TokenResponseDTO,
+    responses={
+        200: {"description": "Tokens refreshed successfully."},
+        401: {"description": "Invalid or expired refresh token."},
+    },
+)
+async def refresh_token_route(
+    request: RefreshTokenRequestDTO,
+    token_repo: RefreshTokenRepository,
+):
+    """
+    Refresh token. The operation exchanges a refresh token for a new access token and a new refresh token. Each refresh token can be used once.
+    """
+    tokens = await token_repo.delete_returning(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    )
+    if not tokens or tokens[0].expires_at <= datetime.now():
+        raise HTTPException(
+            status.HTTP_401_UNAUTHORIZED,
+            {"error_message": "Invalid or expired refresh token.", "error_code": 1},
+        )
+
+    return FastJSONResponse(await issue_tokens(token_repo, tokens[0].user_id))
 
 
 @auth_router.get(
@@ -101,3 +259,57 @@ def verify_token_route(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid or expired token. Error: {str(e)}",
         )
+
+
+@auth_router.post(
+    "/verify/batch",
+    response_model=TokenBatchResponseDTO,
+    responses={
+        200: {"description": "Verification result for every token."},
+        422: {"description": "Bad request. Empty or too many tokens."},
+    },
+)
+async def verify_token_batch_route(request: TokenBatchRequestDTO):
+    """
+    Verify tokens. The operation verifies up to AUTH_JWT__VERIFY_BATCH_MAX_TOKENS tokens at once and returns claims or an error for each token, in request order.
+    """
+    results = []
+    for payload in await jwt_service.decode_jwt_batch(request.tokens):
+        if isinstance(payload, Exception):
+            results.append(TokenVerificationDTO(valid=False, error=str(payload)))
+        elif not payload.get("sub"):
+            results.append(
+                TokenVerificationDTO(
+                    valid=False, error="Token payload does not contain 'sub'."
+                )
+            )
+        else:
+            results.append(
+                TokenVerificationDTO(
+                    valid=True, user_id=str(payload["sub"]), claims=payload
+                )
+            )
+    return FastJSONResponse(TokenBatchResponseDTO(results=results))
+
+
+@jwks_router.get(
+    "/.well-known/jwks.json",
+    responses={
+        200: {"description": "Public keys for local token verification."},
+        304: {"description": "Not modified."},
+    },
+)
+def jwks_route(request: Request):
+    """
+    Get JWKS. The operation returns public keys used to sign tokens, so other services can verify tokens locally.
+    """
+    headers = {
+        "ETag": jwt_service.jwks_etag,
+        "Cache-Control": f"public, max-age={settings.auth_jwt.jwks_max_age_seconds}",
+    }
+    if request.headers.get("if-none-match") == jwt_service.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=jwt_service.jwks_body, media_type="application/json", headers=headers
+    )
@@ -1,15 +1,46 @@
-from pydantic import BaseModel, EmailStr
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+
+from core.config import settings
+
+
+# Почта хранится и ищется в нижнем регистре
+LowercaseEmail = Annotated[EmailStr, AfterValidator(str.lower)]
 
 
 class TokenRequestDTO(BaseModel):
-    email: EmailStr
+    email: LowercaseEmail
     password: str
 
 
 class TokenResponseDTO(BaseModel):
     access_token: str
     token_type: str = "baerer"
+    refresh_token: str | None = None
+    expires_in: int | None = None
+
+
+class RefreshTokenRequestDTO(BaseModel):
+    refresh_token: str
 
 
 class TokenDTO(BaseModel):
     token: str
+
+
+class TokenBatchRequestDTO(BaseModel):
+    tokens: list[str] = Field(
+        min_length=1, max_length=settings.auth_jwt.verify_batch_max_tokens
+    )
+
+
+class TokenVerificationDTO(BaseModel):
+    valid: bool
+    user_id: str | None = None
+    claims: dict | None = None
+    error: str | None = None
+
+
+class TokenBatchResponseDTO(BaseModel):
+    results: list[TokenVerificationDTO]
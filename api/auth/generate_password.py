@@ -1,16 +1,216 @@
+import asyncio
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
 import jwt
 
-from core.config import settings
+from core.config import PasswordHashing, settings
+from core.metrics import PASSWORD_HASH_SECONDS
+
+try:
+    import argon2
+except ImportError:  # argon2id доступен только с установленным argon2-cffi
+    argon2 = None
+
+
+ARGON2_PREFIX = b"$argon2"
+ARGON2_MIN_MEMORY_COST = 19_456
+
+BCRYPT_HASH = re.compile(
+    rb"\$2[abxy]\$(?P<rounds>0[4-9]|[12][0-9]|3[01])\$[./A-Za-z0-9]{53}"
+)
+ARGON2_HASH = re.compile(
+    rb"\$argon2(id|i|d)\$v=\d+\$m=\d+,t=\d+,p=\d+\$[A-Za-z0-9+/]+\$[A-Za-z0-9+/]+"
+)
 
 
-def hash_password(password: str) -> bytes:
-    """Шифруем пароль"""
-    salt = bcrypt.gensalt()
+def _argon2_hasher(policy: PasswordHashing) -> "argon2.PasswordHasher":
+    if argon2 is None:
+        raise RuntimeError("argon2id requires the argon2-cffi package")
+    return argon2.PasswordHasher(
+        time_cost=policy.argon2_time_cost,
+        memory_cost=policy.argon2_memory_cost,
+        parallelism=policy.argon2_parallelism,
+        type=argon2.Type.ID,
+    )
+
+
+def hash_password(password: str, policy: PasswordHashing = settings.password) -> bytes:
+    """Шифруем пароль по текущей политике хеширования"""
+    if policy.scheme == "argon2id":
+        return _argon2_hasher(policy).hash(password).encode()
+    salt = bcrypt.gensalt(rounds=policy.bcrypt_rounds)
     return bcrypt.hashpw(password.encode(), salt)
 
 
+def is_password_hash(value: bytes) -> bool:
+    """Проверяем, что значение похоже на bcrypt или argon2 хеш"""
+    return bool(BCRYPT_HASH.fullmatch(value) or ARGON2_HASH.fullmatch(value))
+
+
 def validate_password(password: str, hashed_password: bytes) -> bool:
-    """Проверка совпадения пароля"""
+    """Проверка совпадения пароля, схема определяется по самому хешу"""
+    if hashed_password.startswith(ARGON2_PREFIX):
+        if argon2 is None:
+            raise RuntimeError("argon2id requires the argon2-cffi package")
+        try:
+            return argon2.PasswordHasher().verify(hashed_password.decode(), password)
+        except argon2.exceptions.VerifyMismatchError:
+            return False
     return bcrypt.checkpw(password=password.encode(), hashed_password=hashed_password)
+
+
+def needs_rehash(
+    hashed_password: bytes, policy: PasswordHashing = settings.password
+) -> bool:
+    """
+    Проверяем, что хеш создан другой схемой или с другими параметрами,
+    чем требует политика. Хеш неизвестного формата тоже требует замены.
+    """
+    if hashed_password.startswith(ARGON2_PREFIX):
+        if policy.scheme != "argon2id":
+            return True
+        return _argon2_hasher(policy).check_needs_rehash(hashed_password.decode())
+    match = BCRYPT_HASH.fullmatch(hashed_password)
+    if match is None:
+        return True
+    return policy.scheme != "bcrypt" or int(match["rounds"]) != policy.bcrypt_rounds
+
+
+def _verify_seconds(policy: PasswordHashing) -> float:
+    password_hash = hash_password("autotune-password", policy)
+    start = time.perf_counter()
+    validate_password("autotune-password", password_hash)
+    return time.perf_counter() - start
+
+
+def tune_policy(
+    target_seconds: float, policy: PasswordHashing = settings.password
+) -> PasswordHashing:
+    """
+    Подбираем самые дорогие параметры схемы ``policy.scheme``, при которых
+    проверка пароля на этой машине укладывается в ``target_seconds``.
+
+    Для bcrypt увеличивается cost. Для argon2id объем памяти уменьшается
+    (не ниже минимума OWASP), пока один проход не уложится в цель, затем
+    увеличивается число проходов.
+    """
+    if policy.scheme == "bcrypt":
+        tuned = policy.model_copy(update={"bcrypt_rounds": 4})
+        for rounds in range(5, 32):
+            candidate = policy.model_copy(update={"bcrypt_rounds": rounds})
+            if _verify_seconds(candidate) > target_seconds:
+                break
+            tuned = candidate
+        return tuned
+
+    tuned = policy.model_copy(update={"argon2_time_cost": 1})
+    while (
+        _verify_seconds(tuned) > target_seconds
+        and tuned.argon2_memory_cost // 2 >= ARGON2_MIN_MEMORY_COST
+    ):
+        tuned = tuned.model_copy(
+            update={"argon2_memory_cost": tuned.argon2_memory_cost // 2}
+        )
+    for time_cost in range(2, 65):
+        candidate = tuned.model_copy(update={"argon2_time_cost": time_cost})
+        if _verify_seconds(candidate) > target_seconds:
+            break
+        tuned = candidate
+    return tuned
+
+
+class PasswordHasherBusy(Exception):
+    """Очередь на хеширование переполнена."""
+
+
+class PasswordHasher:
+    """
+    Асинхронная обертка над хешированием паролей.
+
+    Хеширование выполняется в пуле потоков (bcrypt и argon2 отпускают GIL), поэтому
+    event loop не блокируется. Если задач в работе и в очереди больше
+    ``max_pending``, новая задача сразу отклоняется с ``PasswordHasherBusy``.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.password.workers,
+        max_pending: int = settings.password.max_pending,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.pending - self.workers, 0)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hasher"
+            )
+        return self._executor
+
+    @staticmethod
+    def _timed(func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+    async def _run(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Password hasher queue is full")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(
+                self._get_executor(), self._timed, func, *args
+            )
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.hash_seconds_total += elapsed
+        self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+        PASSWORD_HASH_SECONDS.observe(elapsed, operation)
+        return result
+
+    async def hash(self, password: str) -> bytes:
+        return await self._run("hash", hash_password, password)
+
+    async def validate(self, password: str, hashed_password: bytes) -> bool:
+        return await self._run(
+            "verify", validate_password, password, hashed_password
+        )
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_seconds_total": self.hash_seconds_total,
+            "hash_seconds_max": self.hash_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -1,8 +1,98 @@
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
 import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from pathlib import Path
-from core.config import settings
+from core.cache import TTLCache
+from core.cache.singleflight import SingleFlight
+from core.config import JWTKey, settings
+from core.metrics import JWT_SECONDS
+
+if TYPE_CHECKING:
+    from api.auth.revocation import RevocationStore
+
+
+KEY_TYPES = {
+    "RS256": (rsa.RSAPrivateKey, rsa.RSAPublicKey),
+    "ES256": (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+    "EdDSA": (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+}
+
+
+def load_private_key(path: Path, algorithm: str):
+    """
+    Загружаем приватный ключ из PEM и проверяем, что он подходит алгоритму.
+    """
+    key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+    if not isinstance(key, KEY_TYPES[algorithm][0]):
+        raise ValueError(f"{path} is not a private key for {algorithm}")
+    return key
+
+
+def load_public_key(path: Path, algorithm: str):
+    """
+    Загружаем публичный ключ из PEM и проверяем, что он подходит алгоритму.
+    """
+    key = serialization.load_pem_public_key(path.read_bytes())
+    if not isinstance(key, KEY_TYPES[algorithm][1]):
+        raise ValueError(f"{path} is not a public key for {algorithm}")
+    return key
+
+
+def key_id(public_key) -> str:
+    """
+    Идентификатор ключа по умолчанию: отпечаток SHA-256 публичного ключа.
+    """
+    der = public_key.public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    digest = hashlib.sha256(der).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: object
+    private_key: object | None = None
+    state: str = "active"
+
+    @classmethod
+    def load(cls, config: JWTKey) -> "SigningKey":
+        if config.algorithm not in KEY_TYPES:
+            raise ValueError(
+                f"Unsupported algorithm {config.algorithm}, "
+                f"expected one of {list(KEY_TYPES)}"
+            )
+        private_key = None
+        if config.private_key_path is not None:
+            private_key = load_private_key(config.private_key_path, config.algorithm)
+        return cls(
+            kid=config.kid,
+            algorithm=config.algorithm,
+            public_key=load_public_key(config.public_key_path, config.algorithm),
+            private_key=private_key,
+            state=config.state,
+        )
+
+    def to_jwk(self) -> dict:
+        jwk = jwt.get_algorithm_by_name(self.algorithm).to_jwk(
+            self.public_key, as_dict=True
+        )
+        jwk.update(kid=self.kid, alg=self.algorithm, use="sig")
+        return jwk
 
 
 class JWTService:
@@ -12,31 +102,203 @@ class JWTService:
         public_key_path: Path = settings.auth_jwt.public_key_path,
         algorithm: str = settings.auth_jwt.algorithm,
         access_token_expire_minutes: int = settings.auth_jwt.access_token_exipre_minutes,
+        token_cache_size: int = settings.auth_jwt.token_cache_size,
+        token_cache_ttl_seconds: int = settings.auth_jwt.token_cache_ttl_seconds,
+        keys: list[JWTKey] = settings.auth_jwt.keys,
+        revocations: "RevocationStore | None" = None,
+        verify_workers: int = settings.auth_jwt.verify_batch_workers,
     ):
-        self.private_key = private_key_path.read_text()
-        self.public_key = public_key_path.read_text()
-        self.algorithm = algorithm
+        """
+        Если задан ``keys``, используется связка ключей; иначе одна пара
+        ключей из ``private_key_path``/``public_key_path``, ``kid`` которой
+        вычисляется по публичному ключу.
+        """
+        if keys:
+            ring = [SigningKey.load(key) for key in keys]
+        else:
+            if algorithm not in KEY_TYPES:
+                raise ValueError(
+                    f"Unsupported algorithm {algorithm}, "
+                    f"expected one of {list(KEY_TYPES)}"
+                )
+            public_key = load_public_key(public_key_path, algorithm)
+            ring = [
+                SigningKey(
+                    kid=key_id(public_key),
+                    algorithm=algorithm,
+                    public_key=public_key,
+                    private_key=load_private_key(private_key_path, algorithm),
+                )
+            ]
+
+        active = [key for key in ring if key.state == "active"]
+        if len(active) != 1 or active[0].private_key is None:
+            raise ValueError("Exactly one active key with a private key is required")
+
+        self.keys: dict[str, SigningKey] = {key.kid: key for key in ring}
+        self.active_key = active[0]
+        self.private_key = self.active_key.private_key
+        self.public_key = self.active_key.public_key
+        self.algorithm = self.active_key.algorithm
         self.access_token_expire_minutes = access_token_expire_minutes
+        self.token_cache = TTLCache(token_cache_size, token_cache_ttl_seconds)
+        self.revocations = revocations
+        self.verify_workers = verify_workers
+        self.verifications = SingleFlight("token_verify")
+        self._executor: ThreadPoolExecutor | None = None
+
+        self.jwks_body = json.dumps(
+            {"keys": [key.to_jwk() for key in ring]}, separators=(",", ":")
+        ).encode()
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_body).hexdigest()[:32]}"'
+
+    @staticmethod
+    def _token_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
 
     def encode_jwt(self, payload: dict) -> str:
         """
-        Создаем JWT токен.
+        Создаем JWT токен, подписанный активным ключом.
         """
         if "exp" not in payload:
-            payload["exp"] = datetime.now() + timedelta(
+            payload["exp"] = datetime.now(timezone.utc) + timedelta(
                 minutes=self.access_token_expire_minutes
             )
-        token = jwt.encode(payload, self.private_key, algorithm=self.algorithm)
+        with JWT_SECONDS.time("sign"):
+            token = jwt.encode(
+                payload,
+                self.private_key,
+                algorithm=self.algorithm,
+                headers={"kid": self.active_key.kid},
+            )
         return token
 
+    def _verification_key(self, token: str) -> SigningKey:
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            return self.active_key
+        if kid not in self.keys:
+            raise jwt.InvalidTokenError(f"Unknown kid {kid}")
+        return self.keys[kid]
+
     def decode_jwt(self, token: str) -> dict:
         """
-        Декодируем JWT токен.
+        Декодируем JWT токен ключом из заголовка ``kid`` и проверяем, что
+        токены его владельца не отозваны.
+
+        Проверенные токены кешируются до истечения срока действия, повторная
+        проверка того же токена не выполняет проверку подписи.
+        """
+        key = self._token_key(token)
+        cached = self.token_cache.get(key)
+        if cached is not None:
+            self._check_revoked(cached)
+            return dict(cached)
+
+        decoded = self.verify_signature(token)
+        self._cache_claims(key, decoded)
+        self._check_revoked(decoded)
+        return dict(decoded)
+
+    def verify_signature(self, token: str) -> dict:
+        """
+        Проверяем подпись и срок действия токена без кеша и проверки отзыва.
+        Метод не меняет состояние сервиса и может вызываться из других потоков.
         """
         try:
-            decoded = jwt.decode(token, self.public_key, algorithms=[self.algorithm])
-            return decoded
+            signing_key = self._verification_key(token)
+            with JWT_SECONDS.time("verify"):
+                return jwt.decode(
+                    token, signing_key.public_key, algorithms=[signing_key.algorithm]
+                )
         except jwt.ExpiredSignatureError:
             raise ValueError("Токен истек")
         except jwt.InvalidTokenError:
             raise ValueError("Недействительный токен")
+
+    def _cache_claims(self, key: bytes, claims: dict) -> None:
+        exp = claims.get("exp")
+        ttl = exp - time.time() if isinstance(exp, (int, float)) else None
+        self.token_cache.set(key, claims, ttl)
+
+    async def decode_jwt_batch(self, tokens: list[str]) -> list[dict | ValueError]:
+        """
+        Декодируем несколько токенов. Токены, которых нет в кеше, проверяются
+        параллельно в пуле потоков, одинаковые токены проверяются один раз,
+        в том числе в одновременных вызовах. Для каждого токена возвращаются
+        claims или ``ValueError``.
+        """
+        keys = [self._token_key(token) for token in tokens]
+        claims: dict[bytes, dict | ValueError] = {}
+        pending: dict[bytes, str] = {}
+        for key, token in zip(keys, tokens):
+            if key in claims or key in pending:
+                continue
+            cached = self.token_cache.get(key)
+            if cached is not None:
+                claims[key] = cached
+            else:
+                pending[key] = token
+
+        if pending:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(
+                    self.verifications.do(
+                        key,
+                        functools.partial(
+                            loop.run_in_executor,
+                            self._get_executor(),
+                            self.verify_signature,
+                            token,
+                        ),
+                    )
+                    for key, token in pending.items()
+                ),
+                return_exceptions=True,
+            )
+            for key, result in zip(pending, results):
+                if isinstance(result, dict):
+                    self._cache_claims(key, result)
+                elif not isinstance(result, ValueError):
+                    result = ValueError("Недействительный токен")
+                claims[key] = result
+
+        decoded = []
+        for key in keys:
+            result = claims[key]
+            if isinstance(result, dict):
+                try:
+                    self._check_revoked(result)
+                    result = dict(result)
+                except ValueError as error:
+                    result = error
+            decoded.append(result)
+        return decoded
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.verify_workers, thread_name_prefix="jwt-verify"
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _check_revoked(self, claims: dict) -> None:
+        subject = claims.get("sub")
+        if (
+            self.revocations is not None
+            and subject is not None
+            and self.revocations.is_revoked(str(subject))
+        ):
+            raise ValueError("Токен отозван")
+
+    def invalidate_token(self, token: str) -> None:
+        """
+        Удаляем токен из кеша проверенных токенов.
+        """
+        self.token_cache.delete(self._token_key(token))
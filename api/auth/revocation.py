@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.revoked_token import RevokedToken
+from core.cache.bloom import BloomFilter
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+    """
+    Denylist of token subjects whose access tokens must no longer verify.
+
+    The check in ``is_revoked`` is purely in-memory: a bloom filter answers
+    "not revoked" for almost every token, and only bloom hits consult the
+    exact map of revoked subjects. Revocations are persisted in the
+    ``revoked_tokens`` table and other workers pick them up on ``sync``.
+    Entries must outlive the longest access token still in circulation,
+    which is ``ttl_minutes`` or the current access token lifetime, whichever
+    is longer.
+    """
+
+    def __init__(
+        self,
+        capacity: int = settings.auth_jwt.revocation_capacity,
+        ttl_minutes: int = settings.auth_jwt.revocation_ttl_minutes,
+    ) -> None:
+        self.capacity = capacity
+        self.ttl = timedelta(
+            minutes=max(ttl_minutes, settings.auth_jwt.access_token_exipre_minutes)
+        )
+        self._revoked: dict[str, datetime] = {}
+        self._bloom = BloomFilter(capacity)
+
+    def _remember(self, subject: str, expires_at: datetime) -> None:
+        self._revoked[subject] = max(expires_at, self._revoked.get(subject, expires_at))
+        self._bloom.add(subject)
+
+    def is_revoked(self, subject: str) -> bool:
+        if subject not in self._bloom:
+            return False
+        expires_at = self._revoked.get(subject)
+        return expires_at is not None and expires_at > datetime.now()
+
+    async def revoke(self, session: AsyncSession, subject: str) -> None:
+        """Revoke every access token issued for ``subject`` so far."""
+        expires_at = datetime.now() + self.ttl
+        await session.execute(
+            insert(RevokedToken).values(subject=subject, expires_at=expires_at)
+        )
+        await session.commit()
+        self._remember(subject, expires_at)
+
+    async def sync(self, session: AsyncSession) -> None:
+        """Reload live revocations from the database and drop expired ones."""
+        now = datetime.now()
+        await session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        rows = await session.execute(
+            select(RevokedToken.subject, RevokedToken.expires_at).where(
+                RevokedToken.expires_at > now
+            )
+        )
+        await session.commit()
+
+        # Keep local revocations committed after the SELECT above.
+        revoked = {
+            subject: expires_at
+            for subject, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+        for subject, expires_at in rows:
+            revoked[subject] = max(expires_at, revoked.get(subject, expires_at))
+
+        bloom = BloomFilter(max(self.capacity, len(revoked)))
+        for subject in revoked:
+            bloom.add(subject)
+        self._revoked, self._bloom = revoked, bloom
+
+    async def run_sync(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float = settings.auth_jwt.revocation_sync_seconds,
+    ) -> None:
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.sync(session)
+            except Exception:
+                logger.exception("Failed to sync token revocations")
+            await asyncio.sleep(interval)
+
+
+revocation_store = RevocationStore()
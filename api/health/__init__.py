@@ -0,0 +1,49 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from core.db.session import ping_database
+
+
+READINESS_TIMEOUT_SECONDS = 2
+
+health_router = APIRouter(prefix="/health", tags=["health"])
+
+
+@health_router.get(
+    "/live",
+    responses={200: {"description": "Process is alive."}},
+)
+async def liveness_route():
+    """
+    Liveness probe. The operation answers as long as the worker's event loop is responsive.
+    """
+    return {"status": "alive"}
+
+
+@health_router.get(
+    "/ready",
+    responses={
+        200: {"description": "Ready to serve traffic."},
+        503: {"description": "Starting, shutting down or database unavailable."},
+    },
+)
+async def readiness_route(request: Request):
+    """
+    Readiness probe. The operation checks that startup finished and the database answers.
+    """
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"error_message": "Not ready", "error_code": 1},
+        )
+
+    try:
+        await asyncio.wait_for(ping_database(), READINESS_TIMEOUT_SECONDS)
+    except Exception:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"error_message": "Database unavailable", "error_code": 2},
+        )
+
+    return {"status": "ready"}
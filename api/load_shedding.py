@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from core.concurrency import LOAD_SHED, AIMDLimiter
+from core.config import settings
+
+
+TIMEOUT_HEADER = b"x-request-timeout"
+
+ROUTE_CLASSES = {
+    ("POST", "/auth/token"): "expensive",
+    ("POST", "/user/"): "expensive",
+    ("GET", "/auth/verify"): "verify",
+    ("POST", "/auth/verify/batch"): "verify",
+    ("GET", "/.well-known/jwks.json"): "verify",
+}
+EXEMPT_PREFIXES = ("/health", "/metrics", "/admin")
+
+concurrency_limiters = {
+    name: AIMDLimiter(
+        name, getattr(settings.load_shedding, name), settings.load_shedding.backoff
+    )
+    for name in ("expensive", "verify", "default")
+}
+
+OVERLOADED_BODY = b'{"detail":{"error_message":"Service busy. Retry later."}}'
+DEADLINE_BODY = b'{"detail":{"error_message":"Request deadline exceeded."}}'
+
+
+def route_class(method: str, path: str) -> str | None:
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    return ROUTE_CLASSES.get((method, path), "default")
+
+
+def request_timeout(scope, maximum: float) -> float | None:
+    """Client deadline from ``X-Request-Timeout`` in seconds, capped by ``maximum``."""
+    for name, value in scope["headers"]:
+        if name == TIMEOUT_HEADER:
+            try:
+                return min(float(value), maximum)
+            except ValueError:
+                return None
+    return None
+
+
+class LoadSheddingMiddleware:
+    """
+    Per-route-class adaptive concurrency limits.
+
+    Login and signup hash passwords and are limited separately from the cheap
+    token verification, so a burst of logins cannot starve the gateway. Over
+    the limit the request gets an immediate 503 with ``Retry-After``. With
+    ``X-Request-Timeout`` the work is cancelled once the client stops waiting
+    and the request is answered with 504.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiters: dict[str, AIMDLimiter],
+        max_timeout: float = settings.load_shedding.max_request_timeout_seconds,
+    ) -> None:
+        self.app = app
+        self.limiters = limiters
+        self.max_timeout = max_timeout
+
+    async def __call__(self, scope, receive, send) -> None:
+        name = (
+            route_class(scope["method"], scope["path"])
+            if scope["type"] == "http"
+            else None
+        )
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        timeout = request_timeout(scope, self.max_timeout)
+        if timeout is not None and timeout <= 0:
+            LOAD_SHED.inc(name, "deadline")
+            await self.respond(send, 504, DEADLINE_BODY)
+            return
+
+        limiter = self.limiters[name]
+        if not limiter.try_acquire():
+            await self.respond(send, 503, OVERLOADED_BODY, [(b"retry-after", b"1")])
+            return
+
+        started = False
+
+        async def send_with_state(message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        start = time.perf_counter()
+        dropped = False
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                await self.app(scope, receive, send_with_state)
+        except TimeoutError:
+            # Timeouts raised by the app itself (driver, pool, wait_for) are
+            # errors, not an expired client deadline.
+            if not deadline.expired():
+                raise
+            dropped = True
+            LOAD_SHED.inc(name, "deadline")
+            if not started:
+                await self.respond(send, 504, DEADLINE_BODY)
+        finally:
+            limiter.release(time.perf_counter() - start, dropped)
+
+    @staticmethod
+    async def respond(send, status: int, body: bytes, headers=()) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
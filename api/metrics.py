@@ -0,0 +1,111 @@
+import time
+
+from fastapi import APIRouter, Response
+
+from api.auth import jwt_service
+from api.auth.generate_password import password_hasher
+from api.load_shedding import concurrency_limiters
+from api.user import user_cache
+from core.db.session import checked_out_connections, healthy_replicas
+from core.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    CallbackMetric,
+    registry,
+)
+
+
+CallbackMetric(
+    "auth_password_hash_queue_depth",
+    "Password hashing jobs waiting for a worker.",
+    lambda: password_hasher.queue_depth,
+)
+CallbackMetric(
+    "auth_password_hash_rejected_total",
+    "Password hashing jobs rejected because the queue was full.",
+    lambda: password_hasher.rejected,
+    type="counter",
+)
+CallbackMetric(
+    "auth_token_cache_hits_total",
+    "Verified token cache hits.",
+    lambda: jwt_service.token_cache.hits,
+    type="counter",
+)
+CallbackMetric(
+    "auth_token_cache_misses_total",
+    "Verified token cache misses.",
+    lambda: jwt_service.token_cache.misses,
+    type="counter",
+)
+CallbackMetric(
+    "auth_user_cache_hits_total",
+    "User profile cache hits.",
+    lambda: user_cache.hits,
+    type="counter",
+)
+CallbackMetric(
+    "auth_user_cache_misses_total",
+    "User profile cache misses.",
+    lambda: user_cache.misses,
+    type="counter",
+)
+CallbackMetric(
+    "auth_db_pool_checked_out",
+    "Database connections currently checked out of the pool.",
+    checked_out_connections,
+)
+CallbackMetric(
+    "auth_db_replicas_healthy",
+    "Read replicas currently receiving reads.",
+    healthy_replicas,
+)
+
+for name, limiter in concurrency_limiters.items():
+    CallbackMetric(
+        f"auth_concurrency_limit_{name}",
+        f"Adaptive concurrency limit of {name} routes.",
+        lambda limiter=limiter: int(limiter.limit),
+    )
+
+
+class MetricsMiddleware:
+    """Counts requests and records latency per route template."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUESTS.inc(scope["method"], path, status_code)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, scope["method"], path
+            )
+
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def metrics_route():
+    """
+    Get metrics. The operation returns metrics in Prometheus text format.
+    """
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
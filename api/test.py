@@ -1,9 +1,43 @@
+import asyncio
+import json
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import jwt
 import pytest
 from fastapi import FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from fastapi.testclient import TestClient
-from api.auth import auth_router
-from api.user import user_router
+from api.admin import admin_router
+from app.models.user import User, credentials_query, email_equals
+from api.auth import auth_router, jwks_router, jwt_service as auth_jwt_service
+from api.auth.fast_verify import FastVerifyMiddleware
+from api.user import user_cache, user_router
 from api.auth.generate_token import JWTService
+from api.auth.generate_password import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    hash_password,
+    needs_rehash,
+    validate_password,
+)
+from api.auth.revocation import RevocationStore
+from api.load_shedding import LoadSheddingMiddleware
+from core.concurrency import AIMDLimiter
+from core.config import ConcurrencyLimit, settings
+from core.cache import TTLCache
+from core.cache.singleflight import SingleFlight
+from core.db import Base, session as db_session, uuid7
+from core.db.replicas import ReplicaSet, RoutingSession
+from core.db.repository import ConflictError, DatabaseRepository
+from core.db.session import get_session_factory
+from core import metrics
+from core.metrics import Histogram, Registry, registry
+from core.rate_limit import client_address, parse_networks
 
 
 app = FastAPI()
@@ -16,6 +50,8 @@ def client():
     app = FastAPI()
     app.include_router(auth_router)
     app.include_router(user_router)
+    app.include_router(jwks_router)
+    app.include_router(admin_router)
     return TestClient(app)
 
 
@@ -107,3 +143,699 @@ def test_delete_user_invalid_token_route(client):
     detail = response_json.get("detail")
     assert detail["error_massage"] == "Invalid or expired token"
     assert detail["error_code"] == 3
+
+
+# Тест для отклонения хеширования при переполненной очереди
+def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+
+    async def run():
+        return await asyncio.gather(
+            hasher.hash("password"), hasher.hash("password"), return_exceptions=True
+        )
+
+    first, second = asyncio.run(run())
+    hasher.shutdown()
+
+    assert isinstance(first, bytes)
+    assert isinstance(second, PasswordHasherBusy)
+    assert hasher.stats()["rejected"] == 1
+
+
+# Тест для кеширования проверенных токенов
+def test_jwt_service_caches_verified_tokens():
+    jwt_service = JWTService()
+    token = jwt_service.encode_jwt({"sub": "testuser"})
+
+    assert jwt_service.decode_jwt(token)["sub"] == "testuser"
+    assert jwt_service.decode_jwt(token)["sub"] == "testuser"
+    assert jwt_service.token_cache.hits == 1
+
+    jwt_service.invalidate_token(token)
+    assert len(jwt_service.token_cache) == 0
+
+
+# Тест для одновременного доступа к кешу из пула потоков
+def test_ttl_cache_shared_between_threads():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    cache = TTLCache(maxsize=8, ttl=0.001)
+
+    def worker(seed: int) -> None:
+        for i in range(20_000):
+            key = (seed + i) % 16
+            cache.set(key, i)
+            cache.get(key)
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(worker, seed) for seed in range(8)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(cache) <= 8
+
+
+# Тест для получения публичных ключей
+def test_jwks_route(client):
+    response = client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    keys = response.json()["keys"]
+    assert len(keys) == 1
+
+    token = JWTService().encode_jwt({"sub": "testuser"})
+    header = jwt.get_unverified_header(token)
+    assert header["kid"] == keys[0]["kid"]
+
+    response = client.get(
+        "/.well-known/jwks.json",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+
+# Тест для создания пользователя с занятыми почтой и именем
+def test_create_user_conflict_route(client):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"user_{suffix}@example.com",
+        "password": "password",
+    }
+    assert client.post("/user/", json=user_data).status_code == 200
+
+    response = client.post("/user/", json={**user_data, "username": f"other_{suffix}"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["error_code"] == 1
+
+    response = client.post(
+        "/user/", json={**user_data, "email": f"other_{suffix}@example.com"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"]["error_code"] == 2
+
+
+# Тест для массового импорта и экспорта пользователей
+def test_import_export_users_route(client, monkeypatch):
+    monkeypatch.setattr(settings.bulk, "admin_token", "admin")
+    suffix = uuid.uuid4().hex[:8]
+    lines = [
+        json.dumps(
+            {
+                "email": f"{i}_{suffix}@example.com",
+                "username": f"{i}_{suffix}",
+                "password": "pw",
+            }
+        )
+        for i in range(3)
+    ]
+    lines.append(lines[0])
+    lines.append(
+        json.dumps(
+            {
+                "email": f"plain_{suffix}@example.com",
+                "username": f"plain_{suffix}",
+                "password_hash": "not-a-hash",
+            }
+        )
+    )
+
+    response = client.post("/admin/users/import", content="\n".join(lines))
+    assert response.status_code == 403
+
+    headers = {"X-Admin-Token": "admin"}
+    response = client.post(
+        "/admin/users/import", content="\n".join(lines), headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 3
+    assert response.json()["skipped"] == 1
+    assert response.json()["invalid"] == 1
+
+    response = client.get("/admin/users/export", headers=headers)
+    assert response.status_code == 200
+    emails = {json.loads(line)["email"] for line in response.text.splitlines()}
+    assert f"0_{suffix}@example.com" in emails
+
+
+# Тест для обновления токенов по одноразовому refresh токену
+def test_refresh_token_route(client):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"user_{suffix}@example.com",
+        "password": "password",
+    }
+    assert client.post("/user/", json=user_data).status_code == 200
+
+    response = client.post(
+        "/auth/token",
+        json={"email": user_data["email"], "password": user_data["password"]},
+    )
+    refresh_token = response.json()["refresh_token"]
+
+    response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != refresh_token
+
+    response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+
+# Тест для срока действия access токена при локальном часовом поясе не UTC
+@pytest.mark.parametrize("tz", ["America/New_York", "Asia/Tokyo"])
+def test_access_token_expiry_is_utc(monkeypatch, tz):
+    monkeypatch.setenv("TZ", tz)
+    time.tzset()
+    try:
+        jwt_service = JWTService()
+        now = time.time()
+        claims = jwt_service.decode_jwt(jwt_service.encode_jwt({"sub": "ttl"}))
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    ttl = jwt_service.access_token_expire_minutes * 60
+    assert abs(claims["exp"] - now - ttl) < 5
+
+
+# Тест для отзыва токенов пользователя
+def test_revoked_subject_token_is_rejected():
+    revocations = RevocationStore(capacity=100)
+    jwt_service = JWTService(revocations=revocations)
+    token = jwt_service.encode_jwt({"sub": "revoked"})
+    assert jwt_service.decode_jwt(token)["sub"] == "revoked"
+
+    async def revoke():
+        async with get_session_factory()() as session:
+            await revocations.revoke(session, "revoked")
+
+    asyncio.run(revoke())
+
+    with pytest.raises(ValueError):
+        jwt_service.decode_jwt(token)
+    assert not revocations.is_revoked("other")
+    # Отзыв переживает токены, выданные со старым сроком 300 000 минут.
+    assert revocations.ttl.total_seconds() > 300_000 * 60
+
+
+# Тест для получения данных пользователя из кеша
+def test_get_user_route_cached(client):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"user_{suffix}@example.com",
+        "password": "password",
+    }
+    created = client.post("/user/", json=user_data).json()
+    token = JWTService().encode_jwt({"sub": created["id"]})
+    hits = user_cache.hits
+
+    response = client.get("/user/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json() == created
+    assert user_cache.hits == hits + 1
+
+
+# Тест для формата метрик Prometheus
+def test_metrics_render(monkeypatch):
+    test_registry = Registry(enabled=True)
+    monkeypatch.setattr(metrics, "registry", test_registry)
+    histogram = Histogram("test_duration_seconds", "Test.", ("operation",))
+    histogram.observe(0.003, "sign")
+    histogram.observe(20, "sign")
+
+    rendered = test_registry.render()
+    assert "test_duration_seconds" not in registry.render()
+
+    assert 'test_duration_seconds_bucket{operation="sign",le="0.005"} 1' in rendered
+    assert 'test_duration_seconds_bucket{operation="sign",le="+Inf"} 2' in rendered
+    assert 'test_duration_seconds_count{operation="sign"} 2' in rendered
+
+
+# Тест для совпадения ответов быстрой проверки токена и обычного маршрута
+@pytest.mark.parametrize(
+    "authorization",
+    [
+        None,
+        "Bearer",
+        "Basic abc",
+        "Bearer invalidtoken",
+        "Bearer {token}",
+        "Bearer {token_without_sub}",
+    ],
+)
+def test_fast_verify_matches_route(client, authorization):
+    fast_app = FastAPI()
+    fast_app.include_router(auth_router)
+    fast_app.add_middleware(FastVerifyMiddleware, jwt_service=auth_jwt_service)
+    fast_client = TestClient(fast_app)
+
+    headers = {}
+    if authorization is not None:
+        headers["Authorization"] = authorization.format(
+            token=auth_jwt_service.encode_jwt({"sub": "testuser"}),
+            token_without_sub=auth_jwt_service.encode_jwt({"name": "testuser"}),
+        )
+
+    expected = client.get("/auth/verify", headers=headers)
+    response = fast_client.get("/auth/verify", headers=headers)
+
+    assert response.status_code == expected.status_code
+    assert response.content == expected.content
+    assert response.headers.get("x-user-id") == expected.headers.get("x-user-id")
+
+
+# Тест для пакетной проверки токенов
+def test_verify_token_batch_route(client):
+    token = auth_jwt_service.encode_jwt({"sub": "testuser"})
+    fresh_token = auth_jwt_service.encode_jwt({"sub": "otheruser"})
+
+    response = client.post(
+        "/auth/verify/batch",
+        json={"tokens": [token, "invalidtoken", fresh_token, token]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["valid"] for result in results] == [True, False, True, True]
+    assert results[0]["user_id"] == "testuser"
+    assert results[2]["claims"]["sub"] == "otheruser"
+    assert results[1]["error"]
+
+    response = client.post("/auth/verify/batch", json={"tokens": []})
+    assert response.status_code == 422
+
+
+# Тест для ограничения частоты попыток входа по почте
+def test_get_token_rate_limited_by_email(client):
+    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    credentials = {"email": email, "password": "password"}
+
+    for _ in range(settings.rate_limit.login_email_burst):
+        assert client.post("/auth/token", json=credentials).status_code == 403
+
+    response = client.post("/auth/token", json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+
+
+# Тест для определения адреса клиента за доверенным прокси
+def test_client_address_behind_trusted_proxy():
+    proxies = parse_networks(["10.0.0.0/8"])
+
+    assert client_address("10.0.0.5", "203.0.113.7", proxies) == "203.0.113.7"
+    chain = "1.1.1.1, 203.0.113.7, 10.0.0.9"
+    assert client_address("10.0.0.5", chain, proxies) == "203.0.113.7"
+    assert client_address("198.51.100.1", "203.0.113.7", proxies) == "198.51.100.1"
+    assert client_address("10.0.0.5", None, proxies) == "10.0.0.5"
+    assert client_address(None, None, ()) == "unknown"
+
+
+# Тест для перехеширования пароля с устаревшими параметрами при входе
+def test_get_token_upgrades_password_hash(client, monkeypatch):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"user_{suffix}@example.com",
+        "password": "password",
+    }
+    monkeypatch.setattr(settings.password, "bcrypt_rounds", 4)
+    assert client.post("/user/", json=user_data).status_code == 200
+    monkeypatch.setattr(settings.password, "bcrypt_rounds", 5)
+
+    response = client.post(
+        "/auth/token",
+        json={"email": user_data["email"], "password": user_data["password"]},
+    )
+    assert response.status_code == 200
+
+    async def stored_hash():
+        async with get_session_factory()() as session:
+            return await session.scalar(
+                select(User.password_hash).where(User.email == user_data["email"])
+            )
+
+    password_hash = asyncio.run(stored_hash())
+    assert not needs_rehash(password_hash)
+    assert validate_password(user_data["password"], password_hash)
+
+
+# Тест для проверки хешей argon2id и смены схемы
+def test_argon2id_policy():
+    pytest.importorskip("argon2")
+    policy = settings.password.model_copy(
+        update={
+            "scheme": "argon2id",
+            "argon2_memory_cost": 8_192,
+            "argon2_time_cost": 1,
+        }
+    )
+    password_hash = hash_password("password", policy)
+
+    assert password_hash.startswith(b"$argon2id$")
+    assert validate_password("password", password_hash)
+    assert not validate_password("wrong", password_hash)
+    assert not needs_rehash(password_hash, policy)
+    assert needs_rehash(password_hash, settings.password)
+    assert needs_rehash(b"$pbkdf2-sha256$29000$unknown", settings.password)
+
+
+# Тест для входа по почте в другом регистре
+def test_get_token_case_insensitive_email(client):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"User_{suffix}@Example.com",
+        "password": "password",
+    }
+    response = client.post("/user/", json=user_data)
+    assert response.status_code == 200
+    assert response.json()["email"] == user_data["email"].lower()
+
+    response = client.post(
+        "/auth/token",
+        json={"email": user_data["email"].upper(), "password": "password"},
+    )
+    assert response.status_code == 200
+
+    user_data["username"] = f"other_{suffix}"
+    response = client.post("/user/", json=user_data)
+    assert response.status_code == 400
+
+
+# Тест для конфликта по почте через уникальный индекс lower(email)
+def test_create_conflict_on_lower_email_index():
+    suffix = uuid.uuid4().hex[:8]
+    data = {
+        "email": f"user_{suffix}@example.com",
+        "username": f"user_{suffix}",
+        "password_hash": b"hash",
+    }
+
+    async def scenario():
+        async with get_session_factory()() as session:
+            repository = DatabaseRepository(User, session)
+            user_id = (await repository.create(data)).id
+            try:
+                with pytest.raises(ConflictError) as error:
+                    await repository.create(
+                        {
+                            **data,
+                            "email": data["email"].upper(),
+                            "username": f"other_{suffix}",
+                        }
+                    )
+                assert error.value.column == "email"
+            finally:
+                await repository.delete(user_id)
+
+    asyncio.run(scenario())
+
+
+# Тест для использования индекса lower(email) при поиске по почте
+def test_email_lookup_uses_lower_index():
+    async def query_plan():
+        async with get_session_factory()() as session:
+            dialect = session.get_bind().dialect
+            query = select(User.id).where(email_equals("User@Example.com"))
+            compiled = query.compile(
+                dialect=dialect, compile_kwargs={"literal_binds": True}
+            )
+            if dialect.name == "sqlite":
+                rows = await session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+            else:
+                await session.execute(text("SET LOCAL enable_seqscan = off"))
+                rows = await session.execute(text(f"EXPLAIN {compiled}"))
+            return " ".join(str(row[-1]) for row in rows)
+
+    assert "ix_users_email_lower" in asyncio.run(query_plan())
+
+
+# Тест для того, что отклоненные запросы и попадания в кеш не открывают сессию
+def test_session_not_opened_without_queries(client, monkeypatch):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"user_{suffix}@example.com",
+        "password": "password",
+    }
+    user = client.post("/user/", json=user_data).json()
+    token = auth_jwt_service.encode_jwt({"sub": user["id"]})
+
+    opened = []
+    factory = db_session.get_session_factory
+
+    def counting_factory():
+        opened.append(True)
+        return factory()
+
+    monkeypatch.setattr(db_session, "get_session_factory", counting_factory)
+
+    response = client.get("/user/", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 401
+    response = client.delete("/user/", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 400
+    response = client.get("/user/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert opened == []
+
+
+# Тест для упорядоченных по времени идентификаторов UUIDv7
+def test_uuid7_is_time_ordered():
+    ids = [uuid7() for _ in range(10_000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(id.version == 7 and id.variant == uuid.RFC_4122 for id in ids)
+
+
+# Тест для чтения с реплики, записи в основную БД и перехода на нее при сбое реплики
+def test_replica_routing(tmp_path):
+    async def scenario():
+        primary = create_async_engine(settings.db.url)
+        replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/empty.db")
+        async with replica.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        suffix = uuid.uuid4().hex[:8]
+        only_on_replica = f"replica_{suffix}@example.com"
+        async with async_sessionmaker(replica, expire_on_commit=False)() as session:
+            replica_user = await DatabaseRepository(User, session).create(
+                {
+                    "email": only_on_replica,
+                    "username": f"replica_{suffix}",
+                    "password_hash": b"hash",
+                }
+            )
+            replica_user_id = replica_user.id
+
+        replicas = ReplicaSet([replica])
+        factory = async_sessionmaker(
+            primary, sync_session_class=RoutingSession, replicas=replicas
+        )
+        async with factory() as session:
+            repository = DatabaseRepository(User, session)
+            assert await repository.exists(email_equals(only_on_replica))
+            assert await repository.execute(credentials_query(only_on_replica))
+            assert await repository.get(replica_user_id) is not None
+            assert not session.info.get("primary")
+
+            created = f"primary_{suffix}@example.com"
+            await repository.create(
+                {
+                    "email": created,
+                    "username": f"primary_{suffix}",
+                    "password_hash": b"hash",
+                }
+            )
+            assert await repository.exists(email_equals(created))
+            assert not await repository.exists(email_equals(only_on_replica))
+
+        replicas = ReplicaSet([broken])
+        factory = async_sessionmaker(
+            primary, sync_session_class=RoutingSession, replicas=replicas
+        )
+        async with factory() as session:
+            assert await DatabaseRepository(User, session).exists(
+                email_equals(created)
+            )
+        assert replicas.healthy_count == 0
+
+        await replicas.check(timeout=1)
+        assert replicas.healthy_count == 1
+        for engine in (primary, replica, broken):
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+# Тест для объединения одновременных одинаковых вызовов
+def test_single_flight_coalesces_concurrent_calls():
+    calls = []
+
+    async def load():
+        calls.append(True)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight("test")
+        results = await asyncio.gather(*(flight.do("key", load) for _ in range(10)))
+        assert results == [1] * 10
+        assert (flight.executed, flight.coalesced, flight.in_flight) == (1, 9, 0)
+
+        assert await flight.do("key", load) == 2
+
+        errors = await asyncio.gather(
+            *(flight.do("error", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(error, ValueError) for error in errors)
+
+    asyncio.run(scenario())
+
+
+# Тест для отмены первого запроса, пока второй ждет общую загрузку пользователя
+def test_user_lookup_survives_cancelled_leader(client, monkeypatch):
+    suffix = uuid.uuid4().hex[:8]
+    user_data = {
+        "username": f"user_{suffix}",
+        "email": f"user_{suffix}@example.com",
+        "password": "password",
+    }
+    created = client.post("/user/", json=user_data).json()
+    token = auth_jwt_service.encode_jwt({"sub": created["id"]})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    get = DatabaseRepository.get
+    in_transaction = []
+
+    async def slow_get(self, pk):
+        await self.session.execute(text("SELECT 1"))
+        await asyncio.sleep(0.2)
+        # Отмена первого запроса не должна закрыть сессию загрузки.
+        in_transaction.append(self.session.in_transaction())
+        return await get(self, pk)
+
+    monkeypatch.setattr(DatabaseRepository, "get", slow_get)
+
+    async def scenario():
+        await user_cache.invalidate(created["id"])
+        app = FastAPI()
+        app.include_router(user_router)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as test_client:
+            leader = asyncio.create_task(test_client.get("/user/", headers=headers))
+            await asyncio.sleep(0.05)
+            follower = asyncio.create_task(
+                test_client.get("/user/", headers=headers)
+            )
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            response = await follower
+
+        assert leader.cancelled()
+        assert response.status_code == 200
+        assert response.json() == created
+        assert in_transaction == [True]
+
+    asyncio.run(scenario())
+
+
+# Тест для однократной проверки токена в одновременных пакетных запросах
+def test_jwt_service_coalesces_concurrent_verifications():
+    service = JWTService(token_cache_size=0, keys=[])
+    token = service.encode_jwt({"sub": "coalesced"})
+
+    async def scenario():
+        return await asyncio.gather(
+            service.decode_jwt_batch([token]), service.decode_jwt_batch([token])
+        )
+
+    first, second = asyncio.run(scenario())
+    service.shutdown()
+
+    assert first[0]["sub"] == second[0]["sub"] == "coalesced"
+    assert service.verifications.executed == 1
+    assert service.verifications.coalesced == 1
+
+
+# Тест для адаптивного ограничения параллельности и отбрасывания запросов
+def test_load_shedding_limits_and_deadlines():
+    release = asyncio.Event()
+    shed_app = FastAPI()
+
+    @shed_app.post("/user/")
+    async def signup():
+        await release.wait()
+        return {"ok": True}
+
+    @shed_app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        return {"ok": True}
+
+    @shed_app.get("/driver-timeout")
+    async def driver_timeout():
+        raise TimeoutError("pool checkout timed out")
+
+    limit = ConcurrencyLimit(initial=1, min=1, max=4, target_latency_seconds=0.5)
+    limiters = {
+        name: AIMDLimiter(name, limit, backoff=0.5)
+        for name in ("expensive", "verify", "default")
+    }
+    shed_app.add_middleware(LoadSheddingMiddleware, limiters=limiters)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=shed_app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            held = asyncio.create_task(ac.post("/user/"))
+            while limiters["expensive"].in_flight == 0:
+                await asyncio.sleep(0)
+
+            shed = await ac.post("/user/")
+            assert shed.status_code == 503
+            assert shed.headers["retry-after"] == "1"
+            assert limiters["expensive"].rejected == 1
+
+            release.set()
+            assert (await held).status_code == 200
+            assert limiters["expensive"].limit > 1
+
+            expired = await ac.get("/slow", headers={"X-Request-Timeout": "0.05"})
+            assert expired.status_code == 504
+            assert limiters["default"].in_flight == 0
+            assert limiters["default"].limit == 1
+
+            failed = await ac.get("/driver-timeout", headers={"X-Request-Timeout": "5"})
+            assert failed.status_code == 500
+
+    asyncio.run(scenario())
+
+    limiter = AIMDLimiter("unit", limit, backoff=0.5)
+    for _ in range(10):
+        assert limiter.try_acquire()
+        limiter.release(0.01)
+    assert 1 < limiter.limit <= 4
+    limiter.try_acquire()
+    limiter.release(1.0)
+    assert limiter.limit >= 1
+
+    window = ConcurrencyLimit(initial=8, min=1, max=8, target_latency_seconds=0.01)
+    limiter = AIMDLimiter("window", window, backoff=0.5)
+    for _ in range(8):
+        assert limiter.try_acquire()
+    for _ in range(8):
+        limiter.release(0.5)
+    assert limiter.limit == 4
@@ -1,20 +1,25 @@
+import uuid
 from typing import Annotated
 
 from fastapi import APIRouter, Request, Depends, HTTPException, status
 
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from core.db.repository import DatabaseRepository
+from core.cache import LocalCacheBackend, ReadThroughCache
+from core.cache.singleflight import SingleFlight
+from core.config import settings
+from core.db.repository import ConflictError, DatabaseRepository
+from core.db.session import get_session_factory
 from core.fastapi.dependencies import get_repository
-from api.auth.generate_password import hash_password
-from api.auth.generate_token import JWTService
-from app.models.user import User
+from core.fastapi.responses import FastJSONResponse
+from api.auth.generate_password import PasswordHasherBusy, password_hasher
+from api.auth import jwt_service
+from api.auth.revocation import revocation_store
+from app.models.user import User, taken_query
 
 from .dto import UserResponseDTO, UserCreateDTO
 from api.auth.dto import TokenDTO
 
 
-jwt_service = JWTService()
-
 UserRepository = Annotated[
     DatabaseRepository[User],
     Depends(get_repository(User)),
@@ -24,6 +29,43 @@ http_bearer_scheme = HTTPBearer()
 
 user_router = APIRouter(prefix="/user", tags=["user"])
 
+user_cache = ReadThroughCache(
+    LocalCacheBackend(settings.user_cache.size, settings.user_cache.ttl_seconds),
+    prefix="user",
+    ttl=settings.user_cache.ttl_seconds,
+    single_flight=SingleFlight("user_lookup"),
+)
+
+CONFLICT_ERRORS = {
+    "email": {"error_massage": "Такая почта уже существует", "error_code": 1},
+    "username": {"error_massage": "Такое имя уже существует", "error_code": 2},
+}
+
+
+async def load_user(user_id: str) -> dict | None:
+    """
+    Load a user for ``user_cache`` on a session of its own.
+
+    Concurrent lookups share one load, which keeps running after the request
+    that started it is cancelled, so it must not use that request's session.
+    """
+    try:
+        pk = uuid.UUID(user_id)
+    except ValueError:
+        return None
+    async with get_session_factory()() as session:
+        user = await DatabaseRepository(User, session).get(pk)
+        if user is None:
+            return None
+        return UserResponseDTO.model_validate(user).model_dump(mode="json")
+
+
+def conflict_exception(column: str | None) -> HTTPException:
+    return HTTPException(
+        status.HTTP_400_BAD_REQUEST,
+        CONFLICT_ERRORS.get(column, CONFLICT_ERRORS["email"]),
+    )
+
 
 @user_router.get(
     "/",
@@ -35,7 +77,6 @@ user_router = APIRouter(prefix="/user", tags=["user"])
     },
 )
 async def get_user_route(
-    repository: UserRepository,
     credentials: HTTPAuthorizationCredentials = Depends(http_bearer_scheme),
 ):
     """
@@ -58,14 +99,14 @@ async def get_user_route(
             detail={"error_message": "Token does not contain user ID", "error_code": 7},
         )
 
-    user = await repository.get(user_id)
+    user = await user_cache.get_or_load(user_id, lambda: load_user(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"error_message": "User not found", "error_code": 8},
         )
 
-    return user
+    return FastJSONResponse(user)
 
 
 @user_router.post(
@@ -75,6 +116,7 @@ async def get_user_route(
         201: {"description": "User created successfully."},
         422: {"description": "Bad request. Invalid input data."},
         409: {"description": "Conflict. User already exists."},
+        503: {"description": "Service busy. Retry later."},
     },
 )
 async def create_user_route(data: UserCreateDTO, repository: UserRepository):
@@ -82,26 +124,35 @@ async def create_user_route(data: UserCreateDTO, repository: UserRepository):
     Create user. The operation creates new user with provided data.
     """
 
-    if len(await repository.filter(User.email == data.email)) > 0:
-        raise HTTPException(
-            status.HTTP_400_BAD_REQUEST,
-            {"error_massage": "Такая почта уже существует", "error_code": 1},
-        )
-    if len(await repository.filter(User.username == data.username)) > 0:
+    existing = await repository.execute(taken_query(data.email, data.username))
+    if any(row.email.lower() == data.email for row in existing):
+        raise conflict_exception("email")
+    if existing:
+        raise conflict_exception("username")
+
+    try:
+        password_hash = await password_hasher.hash(data.password)
+    except PasswordHasherBusy:
         raise HTTPException(
-            status.HTTP_400_BAD_REQUEST,
-            {"error_massage": "Такое имя уже существует", "error_code": 2},
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"error_massage": "Сервис перегружен, повторите позже", "error_code": 9},
+            headers={"Retry-After": "1"},
         )
 
-    user = await repository.create(
-        {
-            "username": data.username,
-            "email": data.email,
-            "password_hash": hash_password(data.password),
-        }
-    )
+    try:
+        user = await repository.create(
+            {
+                "username": data.username,
+                "email": data.email,
+                "password_hash": password_hash,
+            }
+        )
+    except ConflictError as error:
+        raise conflict_exception(error.column)
 
-    return UserResponseDTO.model_validate(user)
+    response = UserResponseDTO.model_validate(user)
+    await user_cache.set(str(response.id), response.model_dump(mode="json"))
+    return FastJSONResponse(response)
 
 
 @user_router.delete(
@@ -137,13 +188,14 @@ async def delete_user_route(
             {"error_massage": "Token does not contain user ID", "error_code": 4},
         )
 
-    user = await user_repo.get(user_id)
-    if not user:
+    if not await user_repo.delete(user_id):
         raise HTTPException(
             status.HTTP_400_BAD_REQUEST,
             {"error_massage": "User not found", "error_code": 5},
         )
 
-    await user_repo.delete(user_id)
+    await revocation_store.revoke(user_repo.session, str(user_id))
+    await user_cache.invalidate(user_id)
+    jwt_service.invalidate_token(token)
 
     return {"detail": "User deleted successfully"}
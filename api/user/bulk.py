@@ -0,0 +1,235 @@
+import asyncio
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.auth.generate_password import hash_password
+from app.models.user import User
+from core.config import settings
+from core.db import uuid7
+
+from .dto import UserImportDTO, UserImportResultDTO
+
+
+FORMATS = ("ndjson", "csv")
+COLUMNS = ("id", "email", "username", "password_hash", "created_at", "updated_at")
+MAX_REPORTED_ERRORS = 100
+
+_hash_executor: ProcessPoolExecutor | None = None
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=settings.bulk.hash_workers)
+    return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
+def hash_passwords(passwords: list[str]) -> list[bytes]:
+    return [hash_password(password) for password in passwords]
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode().rstrip("\r")
+    if buffer:
+        yield buffer.decode().rstrip("\r")
+
+
+async def parse_records(
+    lines: AsyncIterable[str], format: str
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield ``(line number, record, error)`` for every non-empty line."""
+    header = None
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+
+        if format == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            yield number, dict(zip(header, values)), None
+            continue
+
+        try:
+            yield number, json.loads(line), None
+        except json.JSONDecodeError as error:
+            yield number, None, str(error)
+
+
+async def _hash_batch(records: list[UserImportDTO]) -> list[bytes]:
+    passwords = [record.password for record in records if record.password_hash is None]
+    hashed = []
+    if passwords:
+        loop = asyncio.get_running_loop()
+        workers = settings.bulk.hash_workers
+        size = -(-len(passwords) // workers)
+        chunks = [passwords[i : i + size] for i in range(0, len(passwords), size)]
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(get_hash_executor(), hash_passwords, chunk)
+                for chunk in chunks
+            )
+        )
+        hashed = [password_hash for chunk in results for password_hash in chunk]
+
+    hashed_iter = iter(hashed)
+    return [
+        (
+            record.password_hash.encode()
+            if record.password_hash is not None
+            else next(hashed_iter)
+        )
+        for record in records
+    ]
+
+
+async def _copy_rows(session: AsyncSession, rows: list[tuple]) -> int:
+    """COPY rows into a temp table, then move them skipping conflicts."""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver = raw_connection.driver_connection
+    table = User.__tablename__
+    columns = ", ".join(COLUMNS)
+
+    async with driver.transaction():
+        await driver.execute(
+            f"CREATE TEMP TABLE {table}_import "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await driver.copy_records_to_table(
+            f"{table}_import", records=rows, columns=COLUMNS
+        )
+        status = await driver.execute(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT {columns} FROM {table}_import ON CONFLICT DO NOTHING"
+        )
+    return int(status.split()[-1])
+
+
+async def _insert_rows(session: AsyncSession, rows: list[tuple]) -> int:
+    """Batched executemany insert for drivers without COPY support."""
+    connection = await session.connection()
+    dialect_insert = (
+        sqlite.insert if connection.dialect.name == "sqlite" else postgresql.insert
+    )
+    query = dialect_insert(User).on_conflict_do_nothing().returning(User.id)
+    result = await session.execute(query, [dict(zip(COLUMNS, row)) for row in rows])
+    inserted = len(result.all())
+    await session.commit()
+    return inserted
+
+
+async def _write_batch(session: AsyncSession, records: list[UserImportDTO]) -> int:
+    now = datetime.now()
+    hashes = await _hash_batch(records)
+    rows = [
+        (uuid7(), record.email, record.username, password_hash, now, now)
+        for record, password_hash in zip(records, hashes)
+    ]
+
+    connection = await session.connection()
+    if connection.dialect.driver == "asyncpg":
+        return await _copy_rows(session, rows)
+    return await _insert_rows(session, rows)
+
+
+async def import_users(
+    session: AsyncSession,
+    lines: AsyncIterable[str],
+    format: str = "ndjson",
+    batch_size: int = settings.bulk.batch_size,
+) -> UserImportResultDTO:
+    """
+    Import users from NDJSON or CSV lines.
+
+    Each record needs ``email``, ``username`` and either ``password`` or an
+    existing bcrypt ``password_hash``. Records whose email or username is
+    already taken are skipped.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format {format}, expected one of {FORMATS}")
+
+    result = UserImportResultDTO()
+    batch: list[UserImportDTO] = []
+
+    def reject(number: int, error: str) -> None:
+        result.invalid += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(f"line {number}: {error}")
+
+    async def flush() -> None:
+        inserted = await _write_batch(session, batch)
+        result.inserted += inserted
+        result.skipped += len(batch) - inserted
+        batch.clear()
+
+    async for number, record, error in parse_records(lines, format):
+        if error is not None:
+            reject(number, error)
+            continue
+        try:
+            user = UserImportDTO.model_validate(record)
+        except ValidationError as error:
+            reject(number, str(error.errors()[0]["msg"]))
+            continue
+        if user.password is None and user.password_hash is None:
+            reject(number, "password or password_hash is required")
+            continue
+
+        batch.append(user)
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return result
+
+
+async def export_users(
+    session: AsyncSession, batch_size: int = settings.bulk.batch_size
+) -> AsyncIterator[bytes]:
+    """Stream every user as NDJSON, password hashes included."""
+    query = select(
+        User.id, User.email, User.username, User.password_hash, User.created_at
+    ).execution_options(yield_per=batch_size)
+
+    rows = await session.stream(query)
+    async for partition in rows.partitions():
+        yield b"".join(
+            json.dumps(
+                {
+                    "id": str(row.id),
+                    "email": row.email,
+                    "username": row.username,
+                    "password_hash": row.password_hash.decode(),
+                    "created_at": row.created_at.isoformat(),
+                }
+            ).encode()
+            + b"\n"
+            for row in partition
+        )
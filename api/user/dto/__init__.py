@@ -1,10 +1,13 @@
 from uuid import UUID
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, field_validator
+
+from api.auth.dto import LowercaseEmail
+from api.auth.generate_password import is_password_hash
 
 
 class UserBase(BaseModel):
     username: str
-    email: EmailStr
+    email: LowercaseEmail
 
     class Config:
         from_attributes = True
@@ -16,3 +19,22 @@ class UserCreateDTO(UserBase):
 
 class UserResponseDTO(UserBase):
     id: UUID
+
+
+class UserImportDTO(UserBase):
+    password: str | None = None
+    password_hash: str | None = None
+
+    @field_validator("password_hash")
+    @classmethod
+    def check_password_hash(cls, value: str | None) -> str | None:
+        if value is not None and not is_password_hash(value.encode()):
+            raise ValueError("password_hash must be a bcrypt or argon2 hash")
+        return value
+
+
+class UserImportResultDTO(BaseModel):
+    inserted: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: list[str] = []
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, ForeignKey, LargeBinary, Uuid
+
+from core.db import Base
+from core.db.mixins import TimestampMixin
+
+
+class RefreshToken(Base, TimestampMixin):
+
+    __tablename__ = "refresh_tokens"
+
+    user_id = Column(
+        Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    token_hash = Column(LargeBinary, nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, String
+
+from core.db import Base
+from core.db.mixins import TimestampMixin
+
+
+class RevokedToken(Base, TimestampMixin):
+
+    __tablename__ = "revoked_tokens"
+
+    subject = Column(String, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,4 +1,15 @@
-from sqlalchemy import BigInteger, Column, String, LargeBinary
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    String,
+    LargeBinary,
+    func,
+    lambda_stmt,
+    or_,
+    select,
+)
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from sqlalchemy.dialects.postgresql import UUID
 
 from core.db import Base
@@ -9,6 +20,44 @@ class User(Base, TimestampMixin):
 
     __tablename__ = "users"
 
-    email = Column(String, nullable=False, unique=True)
+    email = Column(String, nullable=False)
     username = Column(String, nullable=False, unique=True)
     password_hash = Column(LargeBinary, nullable=False)
+
+    # Единственный уникальный индекс на почту, адреса хранятся в нижнем регистре.
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
+
+def email_equals(email: str):
+    """
+    Условие поиска пользователя по почте без учета регистра, использует
+    индекс ``ix_users_email_lower``.
+    """
+    return func.lower(User.email) == email.lower()
+
+
+def credentials_query(email: str) -> StatementLambdaElement:
+    """
+    Запрос при входе: ``id`` и хеш пароля пользователя по почте.
+    """
+    email = email.lower()
+    return lambda_stmt(
+        lambda: select(User.id, User.password_hash)
+        .where(func.lower(User.email) == email)
+        .limit(1)
+    )
+
+
+def taken_query(email: str, username: str) -> StatementLambdaElement:
+    """
+    Запрос при регистрации: почты пользователей, у которых уже заняты
+    почта или имя пользователя.
+    """
+    email = email.lower()
+    return lambda_stmt(
+        lambda: select(User.email)
+        .where(or_(func.lower(User.email) == email, User.username == username))
+        .limit(2)
+    )
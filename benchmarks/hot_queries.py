@@ -0,0 +1,109 @@
+"""
+Per-call cost of the login lookup built ad hoc vs as a cached lambda statement.
+
+    python -m benchmarks.hot_queries --iterations 5000
+    python -m benchmarks.hot_queries --profile
+
+An ad hoc ``select()`` is rebuilt on every call and SQLAlchemy generates its
+cache key by walking the whole statement before finding the compiled form.
+A ``lambda_stmt`` is keyed by the lambda's code and its closure values, so
+construction and key generation are reused. ``--profile`` prints the
+heaviest functions of each variant to stderr. By default a temporary SQLite
+database is used; ``--db-url`` points at an already migrated database.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import json
+import pstats
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.user import User, credentials_query, email_equals
+from core.db import Base
+from core.db.repository import DatabaseRepository
+
+
+def ad_hoc(repository: DatabaseRepository, email: str):
+    return repository.only((User.id, User.password_hash), email_equals(email), limit=1)
+
+
+def cached(repository: DatabaseRepository, email: str):
+    return repository.execute(credentials_query(email))
+
+
+VARIANTS = {"ad_hoc": ad_hoc, "lambda_stmt": cached}
+
+
+async def measure(repository, lookup, email: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await lookup(repository, email)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def format_profile(profiler: cProfile.Profile) -> str:
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("tottime").print_stats(15)
+    return output.getvalue()
+
+
+async def run(args: argparse.Namespace, directory: str) -> list[dict]:
+    engine = create_async_engine(
+        args.db_url or f"sqlite+aiosqlite:///{directory}/benchmark.db"
+    )
+    if not args.db_url:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    suffix = uuid.uuid4().hex[:12]
+    email = f"bench_{suffix}@example.com"
+    results = []
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        repository = DatabaseRepository(User, session)
+        user = await repository.create(
+            {"email": email, "username": f"bench_{suffix}", "password_hash": b"hash"}
+        )
+        try:
+            for name, lookup in VARIANTS.items():
+                await lookup(repository, email)
+                profiler = cProfile.Profile() if args.profile else None
+                if profiler:
+                    profiler.enable()
+                us_per_query = await measure(repository, lookup, email, args.iterations)
+                if profiler:
+                    profiler.disable()
+                    print(f"== {name}\n{format_profile(profiler)}", file=sys.stderr)
+                results.append(
+                    {
+                        "variant": name,
+                        "iterations": args.iterations,
+                        "us_per_query": round(us_per_query, 2),
+                    }
+                )
+        finally:
+            await repository.delete(user.id)
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--db-url", help="Database to benchmark instead of SQLite")
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = asyncio.run(run(args, directory))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
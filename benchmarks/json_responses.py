@@ -0,0 +1,130 @@
+"""
+Per-request cost of FastAPI's default JSON responses vs FastJSONResponse.
+
+    python -m benchmarks.json_responses --requests 20000
+
+Each payload is served by two minimal apps: one returns the DTO and lets
+FastAPI validate it against ``response_model``, run ``jsonable_encoder``
+and ``json.dumps``; the other returns ``FastJSONResponse(dto)``. Apps are
+called directly with ASGI messages, so the difference is the serialization
+work per request.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from fastapi import FastAPI
+
+from api.auth.dto import TokenBatchResponseDTO, TokenVerificationDTO
+from api.user.dto import UserResponseDTO
+from core.fastapi.responses import FastJSONResponse
+
+
+PAYLOADS = {
+    "user": UserResponseDTO(
+        id=uuid.uuid4(), username="benchmark", email="benchmark@example.com"
+    ),
+    "verify_batch": TokenBatchResponseDTO(
+        results=[
+            TokenVerificationDTO(
+                valid=True,
+                user_id=str(uuid.uuid4()),
+                claims={"sub": str(uuid.uuid4()), "exp": 1_900_000_000},
+            )
+            for _ in range(100)
+        ]
+    ),
+}
+
+
+def make_route(payload, fast: bool):
+    async def route():
+        return FastJSONResponse(payload) if fast else payload
+
+    return route
+
+
+def create_app(fast: bool) -> FastAPI:
+    app = FastAPI()
+    for name, payload in PAYLOADS.items():
+        app.add_api_route(
+            f"/{name}", make_route(payload, fast), response_model=type(payload)
+        )
+    return app
+
+
+async def call(app, scope: dict) -> bytes:
+    body = b""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.body":
+            body += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return body
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    scope = make_scope(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, dict(scope))
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(requests: int) -> list[dict]:
+    default_app, fast_app = create_app(fast=False), create_app(fast=True)
+    results = []
+    for name in PAYLOADS:
+        path = f"/{name}"
+        default_body = await call(default_app, make_scope(path))
+        fast_body = await call(fast_app, make_scope(path))
+        assert json.loads(default_body) == json.loads(fast_body)
+        default_us = await measure(default_app, path, requests)
+        fast_us = await measure(fast_app, path, requests)
+        results.append(
+            {
+                "payload": name,
+                "requests": requests,
+                "default_us_per_request": round(default_us, 2),
+                "fast_us_per_request": round(fast_us, 2),
+                "saved_us_per_request": round(default_us - fast_us, 2),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Sign/verify throughput of JWTService per supported algorithm.
+
+    python -m benchmarks.jwt_algorithms --iterations 2000
+
+Keys are generated into a temporary directory for every run, the verified
+token cache is disabled so each verify performs the signature check.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from api.auth.generate_token import KEY_TYPES, JWTService
+
+
+def generate_key(algorithm: str):
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(algorithm)
+
+
+def write_keys(directory: Path, algorithm: str) -> tuple[Path, Path]:
+    key = generate_key(algorithm)
+    private_key_path = directory / f"{algorithm}-private.key"
+    public_key_path = directory / f"{algorithm}-public.key"
+    private_key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    public_key_path.write_bytes(
+        key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return private_key_path, public_key_path
+
+
+def measure(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def bench(algorithm: str, iterations: int, directory: Path) -> dict:
+    private_key_path, public_key_path = write_keys(directory, algorithm)
+    service = JWTService(
+        private_key_path=private_key_path,
+        public_key_path=public_key_path,
+        algorithm=algorithm,
+        token_cache_size=0,
+        keys=[],
+    )
+    token = service.encode_jwt({"sub": "benchmark"})
+
+    return {
+        "algorithm": algorithm,
+        "iterations": iterations,
+        "sign_per_second": measure(
+            lambda: service.encode_jwt({"sub": "benchmark"}), iterations
+        ),
+        "verify_per_second": measure(lambda: service.decode_jwt(token), iterations),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument(
+        "--algorithm", action="append", choices=list(KEY_TYPES), dest="algorithms"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            bench(algorithm, args.iterations, Path(directory))
+            for algorithm in args.algorithms or KEY_TYPES
+        ]
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
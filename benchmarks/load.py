@@ -0,0 +1,288 @@
+"""
+Throughput and latency of the auth hot paths under concurrent load.
+
+    python -m benchmarks.load --concurrency 32 --requests 2000 --output bench.json
+    python -m benchmarks.load --baseline bench.json --tolerance 0.2
+
+By default the app from ``api.create_api()`` runs in-process against a
+temporary SQLite database (``--db-url`` points it at a local Postgres
+instead, the schema must already be migrated there). ``--url`` benchmarks an
+already running server. Client and server share one event loop in-process,
+so absolute numbers are lower than against a real server; use the same mode
+when comparing releases. Every request comes from one client with one
+email, so the in-process app runs with login rate limiting off unless
+``--rate-limit`` is given; start a server for ``--url`` with
+``RATE_LIMIT__ENABLED=False``.
+
+A 503 with ``Retry-After`` (load shedding) is retried after the advertised
+delay, as a well-behaved client would; the retries are reported as ``shed``
+and the wait counts towards the request's latency. Throughput and latency
+count successful responses only. The run exits with
+status 1 if any request failed, or, with ``--baseline``, if any scenario's
+p99 latency or throughput is worse than the baseline by more than
+``--tolerance``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import httpx
+from sqlalchemy import make_url
+
+
+SCENARIOS = ("auth_token", "auth_verify", "get_user", "create_user")
+PASSWORD = "benchmark-password"
+MAX_ATTEMPTS = 10
+
+
+async def seed_user(client: httpx.AsyncClient) -> dict:
+    suffix = uuid.uuid4().hex[:12]
+    user = {
+        "username": f"bench_{suffix}",
+        "email": f"bench_{suffix}@example.com",
+        "password": PASSWORD,
+    }
+    response = await client.post("/user/", json=user)
+    response.raise_for_status()
+
+    response = await client.post(
+        "/auth/token", json={"email": user["email"], "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return {**user, "token": response.json()["access_token"]}
+
+
+def make_request(
+    scenario: str, client: httpx.AsyncClient, user: dict
+) -> Callable[[int], Awaitable[httpx.Response]]:
+    headers = {"Authorization": f"Bearer {user['token']}"}
+    run_id = uuid.uuid4().hex[:8]
+    sequence = itertools.count()
+
+    if scenario == "auth_token":
+        credentials = {"email": user["email"], "password": PASSWORD}
+        return lambda i: client.post("/auth/token", json=credentials)
+    if scenario == "auth_verify":
+        return lambda i: client.get("/auth/verify", headers=headers)
+    if scenario == "get_user":
+        return lambda i: client.get("/user/", headers=headers)
+    if scenario == "create_user":
+
+        def create_user(i: int) -> Awaitable[httpx.Response]:
+            n = next(sequence)
+            return client.post(
+                "/user/",
+                json={
+                    "username": f"bench_{run_id}_{n}",
+                    "email": f"bench_{run_id}_{n}@example.com",
+                    "password": PASSWORD,
+                },
+            )
+
+        return create_user
+    raise ValueError(scenario)
+
+
+async def run_scenario(
+    request: Callable[[int], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    shed = 0
+    counter = iter(range(requests))
+
+    async def send(i: int) -> httpx.Response:
+        nonlocal shed
+        for _ in range(MAX_ATTEMPTS - 1):
+            response = await request(i)
+            retry_after = response.headers.get("retry-after")
+            if response.status_code != 503 or retry_after is None:
+                return response
+            shed += 1
+            await asyncio.sleep(float(retry_after))
+        return await request(i)
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    quantiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else []
+    )
+    return {
+        "requests": requests,
+        "errors": errors,
+        "shed": shed,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(quantiles[49] * 1000, 3) if quantiles else None,
+        "p90_ms": round(quantiles[89] * 1000, 3) if quantiles else None,
+        "p99_ms": round(quantiles[98] * 1000, 3) if quantiles else None,
+        "max_ms": round(max(latencies) * 1000, 3) if latencies else None,
+    }
+
+
+async def create_schema() -> None:
+    from core.db import Base
+    from core.db.session import get_engine
+
+    import app.models.refresh_token  # noqa: F401
+    import app.models.revoked_token  # noqa: F401
+    import app.models.user  # noqa: F401
+
+    async with get_engine().begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+async def open_client(stack: AsyncExitStack, args: argparse.Namespace):
+    if args.url:
+        return await stack.enter_async_context(
+            httpx.AsyncClient(base_url=args.url, timeout=60)
+        )
+
+    from core.config import settings
+
+    settings.rate_limit.enabled = args.rate_limit
+    if args.db_url:
+        settings.db.url = args.db_url
+    else:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        settings.db.url = f"sqlite+aiosqlite:///{directory}/benchmark.db"
+        await create_schema()
+
+    from api import create_api
+
+    app = create_api()
+    await stack.enter_async_context(app.router.lifespan_context(app))
+    return await stack.enter_async_context(
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+    )
+
+
+def failures(results: dict) -> list[str]:
+    return [
+        f"{scenario}: {result['errors']}/{result['requests']} requests failed"
+        for scenario, result in results["scenarios"].items()
+        if result["errors"]
+    ]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scenario, result in results["scenarios"].items():
+        previous = baseline["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        if result["errors"] > previous.get("errors", 0):
+            regressions.append(
+                f"{scenario}: errors {previous.get('errors', 0)} -> {result['errors']}"
+            )
+        if result["p99_ms"] and previous["p99_ms"]:
+            if result["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{scenario}: p99 {previous['p99_ms']}ms -> {result['p99_ms']}ms"
+                )
+        if result["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario}: throughput {previous['throughput_rps']} -> "
+                f"{result['throughput_rps']} rps"
+            )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with AsyncExitStack() as stack:
+        client = await open_client(stack, args)
+        user = await seed_user(client)
+
+        scenarios = {}
+        for scenario in args.scenarios or SCENARIOS:
+            request = make_request(scenario, client, user)
+            await run_scenario(request, min(args.warmup, args.requests), 1)
+            scenarios[scenario] = await run_scenario(
+                request, args.requests, args.concurrency
+            )
+
+    return {
+        "meta": {
+            "target": args.url or "in-process",
+            "database": (
+                make_url(args.db_url).get_backend_name() if args.db_url else "sqlite"
+            ),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": sys.version.split()[0],
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, dest="scenarios"
+    )
+    parser.add_argument("--db-url", help="Database for the in-process app")
+    parser.add_argument("--url", help="Benchmark a running server instead")
+    parser.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="Keep login rate limiting on for the in-process app",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON results to a file")
+    parser.add_argument("--baseline", type=Path, help="Previous JSON results")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+
+    problems = [f"ERROR {failure}" for failure in failures(results)]
+    if args.baseline:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        problems += [f"REGRESSION {regression}" for regression in regressions]
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Insert throughput into a large table keyed by UUIDv4 vs UUIDv7.
+
+    python -m benchmarks.uuid_inserts --rows 1000000 --batches 20
+    python -m benchmarks.uuid_inserts --db-url postgresql+asyncpg://...
+
+For each id version a table is prefilled with ``--rows`` rows, then
+``--batches`` batches of ``--batch-size`` rows are inserted and timed, as
+bulk signups and imports do. Random v4 keys scatter over the whole primary
+key index once it no longer fits in cache; v7 keys append to its right
+edge. By default a temporary SQLite database is used; the tables are
+dropped at the end of the run.
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import Column, LargeBinary, MetaData, Table, Uuid, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.db import uuid7
+
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+async def insert_rows(engine, table: Table, generate, rows: int, batch_size: int):
+    payload = b"x" * 64
+    for start in range(0, rows, batch_size):
+        count = min(batch_size, rows - start)
+        async with engine.begin() as connection:
+            await connection.execute(
+                insert(table),
+                [{"id": generate(), "payload": payload} for _ in range(count)],
+            )
+
+
+async def bench(engine, version: str, args: argparse.Namespace) -> dict:
+    metadata = MetaData()
+    table = Table(
+        f"benchmark_uuid_{version}",
+        metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("payload", LargeBinary, nullable=False),
+    )
+    generate = GENERATORS[version]
+
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.drop_all)
+        await connection.run_sync(metadata.create_all)
+    try:
+        start = time.perf_counter()
+        await insert_rows(engine, table, generate, args.rows, args.batch_size)
+        prefill = time.perf_counter() - start
+
+        measured_rows = args.batches * args.batch_size
+        start = time.perf_counter()
+        await insert_rows(engine, table, generate, measured_rows, args.batch_size)
+        measured = time.perf_counter() - start
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(metadata.drop_all)
+
+    return {
+        "version": version,
+        "prefill_rows": args.rows,
+        "prefill_rows_per_second": round(args.rows / prefill, 2),
+        "measured_rows": measured_rows,
+        "rows_per_second": round(measured_rows / measured, 2),
+        "ms_per_batch": round(measured / args.batches * 1000, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            args.db_url or f"sqlite+aiosqlite:///{directory}/benchmark.db"
+        )
+        try:
+            return [await bench(engine, version, args) for version in GENERATORS]
+        finally:
+            await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--db-url", help="Database to benchmark instead of SQLite")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
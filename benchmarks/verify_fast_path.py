@@ -0,0 +1,92 @@
+"""
+Per-request cost of /auth/verify through the full FastAPI stack vs the raw
+ASGI fast path.
+
+    python -m benchmarks.verify_fast_path --requests 20000
+
+The app from ``api.create_api()`` is called directly with ASGI messages, so
+the numbers exclude HTTP parsing and sockets and show only the in-app cost.
+The same token is verified repeatedly, as the gateway does for hot tokens.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from core.config import settings
+
+
+async def call(app, scope: dict) -> int:
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(fast_verify: bool, requests: int, token: str) -> dict:
+    settings.auth_jwt.fast_verify = fast_verify
+
+    from api import create_api
+
+    app = create_api()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/auth/verify",
+        "raw_path": b"/auth/verify",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    assert await call(app, dict(scope)) == 200
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, dict(scope))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "fast_verify": fast_verify,
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 2),
+        "us_per_request": round(elapsed / requests * 1_000_000, 2),
+    }
+
+
+async def run(requests: int) -> list[dict]:
+    from api.auth import jwt_service
+
+    token = jwt_service.encode_jwt({"sub": "benchmark"})
+    return [
+        await measure(False, requests, token),
+        await measure(True, requests, token),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
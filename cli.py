@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import sys
+
+from api.auth.generate_password import tune_policy
+from api.user.bulk import (
+    FORMATS,
+    export_users,
+    import_users,
+    shutdown_hash_executor,
+)
+from core.config import settings
+from core.db.session import dispose_engine, get_session_factory
+
+
+async def aiter_file(path: str):
+    with open(path, encoding="utf-8") if path != "-" else sys.stdin as file:
+        for line in file:
+            yield line.rstrip("\r\n")
+
+
+async def run_import(args: argparse.Namespace) -> None:
+    async with get_session_factory()() as session:
+        result = await import_users(
+            session, aiter_file(args.path), args.format, args.batch_size
+        )
+    print(result.model_dump_json(indent=2))
+
+
+async def run_export(args: argparse.Namespace) -> None:
+    with open(args.path, "wb") if args.path != "-" else sys.stdout.buffer as file:
+        async with get_session_factory()() as session:
+            async for chunk in export_users(session, args.batch_size):
+                file.write(chunk)
+
+
+async def run_tune_password_hash(args: argparse.Namespace) -> None:
+    policy = settings.password.model_copy(update={"scheme": args.scheme})
+    tuned = tune_policy(args.target_ms / 1000, policy)
+    print(f"PASSWORD__SCHEME = {tuned.scheme}")
+    if tuned.scheme == "bcrypt":
+        print(f"PASSWORD__BCRYPT_ROUNDS = {tuned.bcrypt_rounds}")
+    else:
+        print(f"PASSWORD__ARGON2_TIME_COST = {tuned.argon2_time_cost}")
+        print(f"PASSWORD__ARGON2_MEMORY_COST = {tuned.argon2_memory_cost}")
+        print(f"PASSWORD__ARGON2_PARALLELISM = {tuned.argon2_parallelism}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        await args.handler(args)
+    finally:
+        await dispose_engine()
+        shutdown_hash_executor()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Auth Service management commands")
+    commands = parser.add_subparsers(required=True)
+
+    import_parser = commands.add_parser("import-users", help="Bulk import users")
+    import_parser.add_argument("path", help="NDJSON/CSV file, '-' for stdin")
+    import_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    import_parser.add_argument(
+        "--batch-size", type=int, default=settings.bulk.batch_size
+    )
+    import_parser.set_defaults(handler=run_import)
+
+    export_parser = commands.add_parser("export-users", help="Export users as NDJSON")
+    export_parser.add_argument("path", help="Output file, '-' for stdout")
+    export_parser.add_argument(
+        "--batch-size", type=int, default=settings.bulk.batch_size
+    )
+    export_parser.set_defaults(handler=run_export)
+
+    tune_parser = commands.add_parser(
+        "tune-password-hash",
+        help="Pick password hashing parameters for a target verify time",
+    )
+    tune_parser.add_argument(
+        "--scheme", choices=("bcrypt", "argon2id"), default=settings.password.scheme
+    )
+    tune_parser.add_argument("--target-ms", type=float, default=250)
+    tune_parser.set_defaults(handler=run_tune_password_hash)
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Protocol
+
+from core.cache.singleflight import SingleFlight
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache with per-entry expiry.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is reached,
+    and are dropped lazily on access after their deadline passes. Sync routes
+    share the cache from FastAPI's threadpool, so every operation holds a lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            deadline, value = entry
+            if deadline <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CacheBackend(Protocol):
+    """Async key-value store behind ``ReadThroughCache``."""
+
+    async def get(self, key: str) -> Any: ...
+
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class LocalCacheBackend:
+    """In-process ``CacheBackend`` used when no shared cache is configured."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class ReadThroughCache:
+    """
+    Serves values from ``backend`` and falls back to ``load`` on a miss.
+
+    Values must be plain JSON-compatible data so that any backend can store
+    them. ``None`` results are not cached. With ``single_flight`` concurrent
+    misses for the same key share one ``load``.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        prefix: str,
+        ttl: float,
+        single_flight: SingleFlight | None = None,
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl = ttl
+        self.single_flight = single_flight
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get_or_load(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = await self.backend.get(self._key(key))
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        if self.single_flight is not None:
+            return await self.single_flight.do(key, lambda: self._load(key, load))
+        return await self._load(key, load)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await load()
+        if value is not None:
+            await self.backend.set(self._key(key), value, self.ttl)
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        await self.backend.set(self._key(key), value, self.ttl)
+
+    async def invalidate(self, key: Hashable) -> None:
+        await self.backend.delete(self._key(key))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,62 @@
+import time
+
+from core.config import ConcurrencyLimit
+from core.metrics import Counter
+
+
+LOAD_SHED = Counter(
+    "auth_load_shed_total",
+    "Requests dropped by route class and reason.",
+    ("route_class", "reason"),
+)
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit that adapts to observed latency.
+
+    Every request that finishes within ``target_latency_seconds`` while the
+    limit was in use raises the limit additively (by about one per full
+    window); a slower or dropped request cuts it by ``backoff``, at most once
+    per window: requests that started before the last cut were admitted
+    under the old limit and do not cut it again. When the database or the
+    hashing pool slows down the limit shrinks, and excess requests are
+    rejected up front instead of queueing behind slow ones.
+    """
+
+    def __init__(self, name: str, config: ConcurrencyLimit, backoff: float) -> None:
+        self.name = name
+        self.min_limit = config.min
+        self.max_limit = config.max
+        self.target_latency = config.target_latency_seconds
+        self.backoff = backoff
+        self.limit = float(config.initial)
+        self.in_flight = 0
+        self.rejected = 0
+        self._decreased_at = float("-inf")
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            LOAD_SHED.inc(self.name, "concurrency")
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, dropped: bool = False) -> None:
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if dropped or latency > self.target_latency:
+            now = time.perf_counter()
+            if now - latency >= self._decreased_at:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._decreased_at = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
@@ -1,7 +1,9 @@
 import os
 from dotenv import load_dotenv
+from typing import Literal
+
 from pydantic import BaseModel
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
 
@@ -18,15 +20,124 @@ DB_URL: str = os.environ.get("DB_URL")
 JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY")
 
 
+class JWTKey(BaseModel):
+    kid: str
+    public_key_path: Path
+    private_key_path: Path | None = None
+    algorithm: str = "RS256"
+    state: Literal["active", "retiring"] = "active"
+
+
 class AuthJWT(BaseModel):
     private_key_path: Path = BASE_DIR / "certifications" / "jwt-private.key"
     public_key_path: Path = BASE_DIR / "certifications" / "jwt-public.key"
     algorithm: str = "RS256"
-    access_token_exipre_minutes: int = 300_000
+    access_token_exipre_minutes: int = 15
+    refresh_token_expire_days: int = 30
+    revocation_capacity: int = 100_000
+    # Отзыв должен пережить старые access токены со сроком 300 000 минут.
+    revocation_ttl_minutes: int = 300_000 + 24 * 60
+    revocation_sync_seconds: float = 30.0
+    token_cache_size: int = 10_000
+    token_cache_ttl_seconds: int = 300
+    keys: list[JWTKey] = []
+    jwks_max_age_seconds: int = 3600
+    fast_verify: bool = False
+    verify_batch_max_tokens: int = 100
+    verify_batch_workers: int = os.cpu_count() or 1
+
+
+class Database(BaseModel):
+    url: str | None = DB_URL
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 500
+    replica_urls: list[str] = []
+    replica_check_seconds: float = 5.0
+    replica_check_timeout_seconds: float = 2.0
+
+
+class PasswordHashing(BaseModel):
+    workers: int = os.cpu_count() or 1
+    max_pending: int = 64
+    scheme: Literal["bcrypt", "argon2id"] = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65_536
+    argon2_parallelism: int = 4
+
+
+class BulkImport(BaseModel):
+    batch_size: int = 5_000
+    hash_workers: int = os.cpu_count() or 1
+    admin_token: str | None = None
+
+
+class UserCache(BaseModel):
+    size: int = 10_000
+    ttl_seconds: int = 60
+
+
+class Metrics(BaseModel):
+    enabled: bool = False
+
+
+class Server(BaseModel):
+    workers: int = os.cpu_count() or 1
+    graceful_timeout: int = 30
+    keepalive: int = 5
+    backlog: int = 2048
+    access_log: bool = False
+
+
+class RateLimit(BaseModel):
+    enabled: bool = True
+    login_ip_per_minute: float = 60
+    login_ip_burst: int = 20
+    login_email_per_minute: float = 5
+    login_email_burst: int = 5
+    max_keys: int = 100_000
+    trusted_proxies: list[str] = []
+
+
+class ConcurrencyLimit(BaseModel):
+    initial: int
+    min: int = 1
+    max: int
+    target_latency_seconds: float
+
+
+class LoadShedding(BaseModel):
+    enabled: bool = True
+    backoff: float = 0.9
+    max_request_timeout_seconds: float = 60.0
+    expensive: ConcurrencyLimit = ConcurrencyLimit(
+        initial=16, min=2, max=64, target_latency_seconds=1.0
+    )
+    verify: ConcurrencyLimit = ConcurrencyLimit(
+        initial=256, min=16, max=2048, target_latency_seconds=0.05
+    )
+    default: ConcurrencyLimit = ConcurrencyLimit(
+        initial=64, min=4, max=512, target_latency_seconds=0.5
+    )
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_nested_delimiter="__")
+
     auth_jwt: AuthJWT = AuthJWT()
+    db: Database = Database()
+    password: PasswordHashing = PasswordHashing()
+    bulk: BulkImport = BulkImport()
+    user_cache: UserCache = UserCache()
+    metrics: Metrics = Metrics()
+    server: Server = Server()
+    rate_limit: RateLimit = RateLimit()
+    load_shedding: LoadShedding = LoadShedding()
 
 
 settings = Settings()
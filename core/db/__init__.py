@@ -1,12 +1,53 @@
+import secrets
+import threading
+import time
 import uuid
 
 from sqlalchemy import orm
 
 
+_uuid7_lock = threading.Lock()
+_uuid7_timestamp = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID version 7 (RFC 9562).
+
+    48 bits of Unix time in milliseconds are followed by a 12-bit counter
+    and 62 random bits. Ids generated by one process are strictly
+    increasing, so inserts are ordered within one growing key range of the
+    primary key index instead of landing on random pages. That range need
+    not be the right edge: current v7 ids sort below most random v4 ids.
+    """
+    global _uuid7_timestamp, _uuid7_counter
+    with _uuid7_lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _uuid7_timestamp:
+            _uuid7_timestamp = timestamp
+            # Seed below half of the counter range to leave room to increment.
+            _uuid7_counter = secrets.randbits(11)
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_timestamp += 1
+                _uuid7_counter = 0
+        timestamp, counter = _uuid7_timestamp, _uuid7_counter
+
+    return uuid.UUID(
+        int=(timestamp & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+
+
 class Base(orm.DeclarativeBase):
     """Base database model."""
 
     id: orm.Mapped[uuid.UUID] = orm.mapped_column(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
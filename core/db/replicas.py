@@ -0,0 +1,106 @@
+import asyncio
+import itertools
+import logging
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.healthy = True
+
+    def mark_down(self) -> None:
+        if self.healthy:
+            logger.warning("Read replica %s is unavailable", self.engine.url)
+        self.healthy = False
+
+
+class ReplicaSet:
+    """
+    Read replicas balanced round-robin.
+
+    A replica that fails a health check or a query is skipped until a later
+    health check succeeds. With no healthy replica reads go to the primary.
+    """
+
+    def __init__(self, engines: list[AsyncEngine]) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self._cycle = itertools.cycle(self.replicas)
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(replica.healthy for replica in self.replicas)
+
+    def choose(self) -> Replica | None:
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def _ping(self, replica: Replica) -> None:
+        async with replica.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check(self, timeout: float) -> None:
+        for replica in self.replicas:
+            try:
+                await asyncio.wait_for(self._ping(replica), timeout)
+            except Exception:
+                replica.mark_down()
+            else:
+                if not replica.healthy:
+                    logger.info("Read replica %s is back", replica.engine.url)
+                replica.healthy = True
+
+    async def run_health_checks(self, interval: float, timeout: float) -> None:
+        while True:
+            await self.check(timeout)
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a healthy replica and every other
+    statement to the primary.
+
+    After the first statement routed to the primary the session stays
+    there, so a request always reads its own writes regardless of
+    replication lag. ``info["replica"]`` holds the replica used by the
+    last read, for retrying it on the primary if the replica fails.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    @staticmethod
+    def is_plain_select(clause) -> bool:
+        # Cached lambda_stmt queries arrive wrapped; route by the statement
+        # they resolve to.
+        if isinstance(clause, StatementLambdaElement):
+            clause = clause._resolved
+        return isinstance(clause, Select) and clause._for_update_arg is None
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        replica = None
+        if not self.info.get("primary") and self.is_plain_select(clause):
+            replica = self.replicas.choose()
+
+        self.info["replica"] = replica
+        if replica is None:
+            self.info["primary"] = True
+            return primary
+        return replica.engine.sync_engine
@@ -1,43 +1,206 @@
+import functools
 import uuid
-from typing import Generic, TypeVar
+from collections.abc import Sequence
+from typing import Any, Generic, TypeVar
 
-from sqlalchemy import BinaryExpression, select
+from sqlalchemy import (
+    BinaryExpression,
+    Executable,
+    Row,
+    delete,
+    exc,
+    exists,
+    func,
+    insert,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.db import Base
+from core.db.session import LazySession
+from core.metrics import DB_QUERY_SECONDS
 
 
 Model = TypeVar("Model", bound=Base)
 
 
+class ConflictError(Exception):
+    """Insert violated a unique constraint on ``column``."""
+
+    def __init__(self, column: str | None) -> None:
+        super().__init__(f"Unique constraint violated on {column}")
+        self.column = column
+
+
+def timed(method):
+    """Record the method's latency in ``DB_QUERY_SECONDS``."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with DB_QUERY_SECONDS.time(self.model.__name__, method.__name__):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def replica_fallback(method):
+    """Retry a read on the primary if the replica it was routed to failed."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except (exc.DBAPIError, OSError):
+            replica = self.session.info.get("replica")
+            if replica is None:
+                raise
+            replica.mark_down()
+            await self.session.rollback()
+            self.session.info["primary"] = True
+            return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class DatabaseRepository(Generic[Model]):
     """Repository for performing database queries."""
 
-    def __init__(self, model: type[Model], session: AsyncSession) -> None:
+    def __init__(
+        self, model: type[Model], session: AsyncSession | LazySession
+    ) -> None:
         self.model = model
-        self.session = session
+        self._session = session
 
+    @property
+    def session(self) -> AsyncSession:
+        if isinstance(self._session, LazySession):
+            return self._session.get()
+        return self._session
+
+    @timed
     async def create(self, data: dict) -> Model:
-        instance = self.model(**data)
-        self.session.add(instance)
-        await self.session.commit()
-        await self.session.refresh(instance)
+        """
+        Insert a row with a single ``INSERT ... RETURNING`` statement.
+
+        Raises ``ConflictError`` naming the column whose unique constraint
+        was violated.
+        """
+        query = insert(self.model).values(**data).returning(self.model)
+        try:
+            instance = await self.session.scalar(query)
+            await self.session.commit()
+        except exc.IntegrityError as error:
+            await self.session.rollback()
+            raise ConflictError(self._conflicting_column(error)) from error
         return instance
 
+    def _conflicting_column(self, error: exc.IntegrityError) -> str | None:
+        # asyncpg reports the constraint name, SQLite the "table.column" or
+        # the index name.
+        cause = getattr(error.orig, "__cause__", None)
+        detail = getattr(cause, "constraint_name", None) or str(error.orig)
+        detail = detail.splitlines()[0] if detail else ""
+        table = self.model.__table__
+        unique = {column.name for column in table.columns if column.unique}
+        for index in table.indexes:
+            if index.unique:
+                unique.update(column.name for column in index.columns)
+        columns = sorted(unique, key=len, reverse=True)
+        for column in columns:
+            if column in detail:
+                return column
+        return None
+
+    @timed
+    @replica_fallback
     async def get(self, pk: uuid.UUID) -> Model | None:
         return await self.session.get(self.model, pk)
 
+    @timed
+    @replica_fallback
+    async def execute(self, statement: Executable) -> list[Row]:
+        """
+        Run a statement defined once elsewhere, e.g. a ``lambda_stmt`` for a
+        hot query whose construction and cache key are reused across calls.
+        """
+        return list(await self.session.execute(statement))
+
+    @timed
+    @replica_fallback
     async def filter(
         self,
         *expressions: BinaryExpression,
+        limit: int | None = None,
     ) -> list[Model]:
         query = select(self.model)
         if expressions:
             query = query.where(*expressions)
+        if limit is not None:
+            query = query.limit(limit)
         return list(await self.session.scalars(query))
 
-    async def delete(self, id: uuid.UUID):
-        user = await self.session.get(self.model, id)
-        if user is not None:
-            await self.session.delete(user)
-            await self.session.commit()
+    @timed
+    @replica_fallback
+    async def first(self, *expressions: BinaryExpression) -> Model | None:
+        query = select(self.model).where(*expressions).limit(1)
+        return await self.session.scalar(query)
+
+    @timed
+    @replica_fallback
+    async def only(
+        self,
+        columns: Sequence[Any],
+        *expressions: BinaryExpression,
+        limit: int | None = None,
+    ) -> list[Row]:
+        """Fetch only ``columns`` as lightweight rows instead of entities."""
+        query = select(*columns)
+        if expressions:
+            query = query.where(*expressions)
+        if limit is not None:
+            query = query.limit(limit)
+        return list(await self.session.execute(query))
+
+    @timed
+    @replica_fallback
+    async def exists(self, *expressions: BinaryExpression) -> bool:
+        query = select(exists().where(*expressions))
+        return bool(await self.session.scalar(query))
+
+    @timed
+    @replica_fallback
+    async def count(self, *expressions: BinaryExpression) -> int:
+        query = select(func.count()).select_from(self.model)
+        if expressions:
+            query = query.where(*expressions)
+        return await self.session.scalar(query)
+
+    @timed
+    async def update(self, id: uuid.UUID, **values: Any) -> bool:
+        """Update a row by primary key. Returns whether a row was updated."""
+        query = (
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**values)
+            .returning(self.model.id)
+        )
+        updated = await self.session.scalar(query)
+        await self.session.commit()
+        return updated is not None
+
+    @timed
+    async def delete_returning(self, *expressions: BinaryExpression) -> list[Model]:
+        """Delete matching rows and return them, in one statement."""
+        query = delete(self.model).where(*expressions).returning(self.model)
+        deleted = list(await self.session.scalars(query))
+        await self.session.commit()
+        return deleted
+
+    @timed
+    async def delete(self, id: uuid.UUID) -> bool:
+        """Delete a row by primary key. Returns whether a row was deleted."""
+        query = delete(self.model).where(self.model.id == id).returning(self.model.id)
+        deleted = await self.session.scalar(query)
+        await self.session.commit()
+        return deleted is not None
@@ -1,19 +1,127 @@
+import time
 from collections.abc import AsyncGenerator
 
-from sqlalchemy import exc
-from sqlalchemy.pool import NullPool
+from sqlalchemy import exc, make_url, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
-from core.config import DB_URL
+from core.config import settings
+from core.db.replicas import ReplicaSet, RoutingSession
+from core.metrics import DB_POOL_CHECKOUT_SECONDS, registry
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        if not registry.enabled:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+_engine: AsyncEngine | None = None
+_replicas: ReplicaSet | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def create_engine(url: str | None = None) -> AsyncEngine:
+    """Create a pooled async engine for ``url`` (the primary by default)."""
+    config = settings.db
+    url = make_url(url or config.url)
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite uses its own pool classes without queue sizing.
+        return create_async_engine(url, echo=config.echo)
+
+    connect_args = {}
+    if url.get_driver_name() == "asyncpg":
+        connect_args["prepared_statement_cache_size"] = config.statement_cache_size
+
+    return create_async_engine(
+        url,
+        echo=config.echo,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        pool_pre_ping=config.pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Process-wide primary engine, created on first use. With
+    ``settings.db.replica_urls`` sessions route reads to the replicas.
+    """
+    global _engine, _replicas, _session_factory
+    if _engine is None:
+        _engine = create_engine()
+        if settings.db.replica_urls:
+            _replicas = ReplicaSet(
+                [create_engine(url) for url in settings.db.replica_urls]
+            )
+            _session_factory = async_sessionmaker(
+                _engine,
+                expire_on_commit=False,
+                sync_session_class=RoutingSession,
+                replicas=_replicas,
+            )
+        else:
+            _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+def get_replicas() -> ReplicaSet | None:
+    get_engine()
+    return _replicas
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    get_engine()
+    return _session_factory
+
+
+async def ping_database() -> None:
+    async with get_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def checked_out_connections() -> int:
+    if _engine is None:
+        return 0
+    pool = _engine.pool
+    return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+
+def healthy_replicas() -> int:
+    return _replicas.healthy_count if _replicas is not None else 0
+
+
+async def dispose_engine() -> None:
+    """Close every pooled connection. Called on application shutdown."""
+    global _engine, _replicas, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+    if _replicas is not None:
+        await _replicas.dispose()
+    _engine = None
+    _replicas = None
+    _session_factory = None
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    engine = create_async_engine(DB_URL, future=True, poolclass=NullPool)
-    factory = async_sessionmaker(engine)
+    factory = get_session_factory()
     async with factory() as session:
         try:
             yield session
@@ -21,3 +129,39 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         except exc.SQLAlchemyError as error:
             await session.rollback()
             raise
+
+
+class LazySession:
+    """
+    Request-scoped holder that creates the ``AsyncSession`` on first use.
+
+    Requests rejected before their first query (invalid token, cache hit,
+    rate limit) never build a session or touch the pool.
+    """
+
+    def __init__(self) -> None:
+        self._session: AsyncSession | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = get_session_factory()()
+        return self._session
+
+
+async def get_lazy_session() -> AsyncGenerator[LazySession, None]:
+    lazy = LazySession()
+    try:
+        yield lazy
+        if lazy.started:
+            await lazy.get().commit()
+    except exc.SQLAlchemyError:
+        if lazy.started:
+            await lazy.get().rollback()
+        raise
+    finally:
+        if lazy.started:
+            await lazy.get().close()
@@ -0,0 +1,29 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pydantic-core is used for every payload without orjson
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered in native code.
+
+    Pydantic models are serialized straight to JSON bytes by pydantic-core,
+    other content by orjson. A route that returns ``FastJSONResponse(dto)``
+    also skips FastAPI's re-validation and ``jsonable_encoder`` pass over a
+    DTO that has already been validated; ``response_model`` then only
+    documents the schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return pydantic_core.to_json(content)
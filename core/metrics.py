@@ -0,0 +1,189 @@
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from core.config import settings
+
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    """
+    Minimal Prometheus-style metrics registry.
+
+    While ``enabled`` is false every instrument is a no-op, so hot paths only
+    pay for one attribute check.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(enabled=settings.metrics.enabled)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        registry.register(self)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        if registry.enabled:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [count per bucket..., count in +Inf, sum]
+        self._values: dict[tuple, list[float]] = {}
+        registry.register(self)
+
+    def observe(self, value: float, *labels) -> None:
+        if not registry.enabled:
+            return
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels) -> Iterator[None]:
+        if not registry.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            series_labels = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{series_labels} {series[-1]}"
+            yield f"{self.name}_count{series_labels} {cumulative}"
+
+
+class CallbackMetric:
+    """Metric whose value is read from ``callback`` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], float],
+        type: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.type = type
+        registry.register(self)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield f"{self.name} {self.callback()}"
+
+
+HTTP_REQUESTS = Counter(
+    "auth_http_requests_total",
+    "HTTP requests by method, route and status.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "auth_http_request_duration_seconds",
+    "HTTP request latency by method and route.",
+    ("method", "route"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "auth_db_query_duration_seconds",
+    "Repository query latency by model and operation.",
+    ("model", "operation"),
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "auth_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "auth_password_hash_duration_seconds",
+    "bcrypt hash/verify time in the worker pool.",
+    ("operation",),
+)
+PASSWORD_REHASHES = Counter(
+    "auth_password_rehash_total",
+    "Password hashes upgraded to the current policy on login.",
+    ("scheme",),
+)
+JWT_SECONDS = Histogram(
+    "auth_jwt_duration_seconds",
+    "JWT signing and signature verification time.",
+    ("operation",),
+)
+SINGLE_FLIGHT_COALESCED = Counter(
+    "auth_single_flight_coalesced_total",
+    "Calls that awaited an identical in-flight call instead of repeating it.",
+    ("name",),
+)
@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+from typing import Protocol
+
+from core.metrics import Counter
+
+
+RATE_LIMIT_DECISIONS = Counter(
+    "auth_rate_limit_decisions_total",
+    "Rate limiter decisions by limiter and outcome.",
+    ("limiter", "outcome"),
+)
+
+
+def parse_networks(values: list[str]) -> tuple[IPv4Network | IPv6Network, ...]:
+    return tuple(ip_network(value, strict=False) for value in values)
+
+
+def client_address(
+    peer: str | None,
+    forwarded_for: str | None,
+    trusted_proxies: tuple[IPv4Network | IPv6Network, ...],
+) -> str:
+    """
+    Address to rate limit for a request received from ``peer``.
+
+    ``X-Forwarded-For`` is only honoured when the peer is a trusted proxy.
+    The header is walked from the right, and the first hop that is not a
+    trusted proxy is the client, so a client cannot spoof its address by
+    sending the header itself.
+    """
+    hops = [peer or "unknown"]
+    if forwarded_for:
+        hops += reversed([hop.strip() for hop in forwarded_for.split(",")])
+    for hop in hops:
+        try:
+            address = ip_address(hop)
+        except ValueError:
+            return hop
+        if not any(address in network for network in trusted_proxies):
+            return hop
+    return hops[-1]
+
+
+class RateLimitBackend(Protocol):
+    """Shared token bucket store behind ``RateLimiter``."""
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until retry."""
+        ...
+
+
+class LocalRateLimitBackend:
+    """
+    In-process token buckets, used when no shared store is configured.
+
+    At most ``max_keys`` buckets are kept; the least recently used bucket is
+    dropped first, which only ever makes the limiter more permissive.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RateLimiter:
+    """Token bucket limiter: ``burst`` requests at once, refilled at ``per_minute``."""
+
+    def __init__(
+        self, backend: RateLimitBackend, name: str, per_minute: float, burst: int
+    ) -> None:
+        self.backend = backend
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.allowed = 0
+        self.rejected = 0
+
+    async def hit(self, key: str) -> float:
+        """Count a request for ``key``. Returns 0 if allowed, else retry-after."""
+        retry_after = await self.backend.acquire(
+            f"{self.name}:{key}", self.rate, self.burst
+        )
+        if retry_after:
+            self.rejected += 1
+            RATE_LIMIT_DECISIONS.inc(self.name, "rejected")
+        else:
+            self.allowed += 1
+            RATE_LIMIT_DECISIONS.inc(self.name, "allowed")
+        return retry_after
@@ -0,0 +1,86 @@
+import logging
+import os
+import signal
+import time
+
+import uvicorn
+
+from core.config import settings
+
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def serve(app: str, host: str, port: int, workers: int | None = None) -> None:
+    """
+    Run ``app`` in production mode with ``workers`` forked processes.
+
+    The app is imported once in the supervisor before forking, so modules,
+    JWT keys and other import-time state are shared copy-on-write by all
+    workers. Connection pools and executors are created lazily inside each
+    worker. SIGTERM/SIGINT are forwarded to the workers, which stop
+    accepting connections and drain in-flight requests for up to
+    ``settings.server.graceful_timeout`` seconds. Workers that die
+    unexpectedly are restarted.
+    """
+    config = settings.server
+    workers = workers or config.workers
+    uvicorn_config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        backlog=config.backlog,
+        timeout_keep_alive=config.keepalive,
+        timeout_graceful_shutdown=config.graceful_timeout,
+        access_log=config.access_log,
+    )
+    uvicorn_config.load()
+    sock = uvicorn_config.bind_socket()
+
+    if workers == 1:
+        uvicorn.Server(uvicorn_config).run(sockets=[sock])
+        return
+
+    children: set[int] = set()
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                uvicorn.Server(uvicorn_config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("Starting %d workers", workers)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            logger.warning("Worker %d exited with status %d, restarting", pid, status)
+            time.sleep(1)
+            spawn()
+
+    sock.close()
+    logger.info("All workers stopped")
@@ -1,12 +1,16 @@
 import uvicorn
 
-from core.config import API_PORT, API_HOST
+from core.config import API_PORT, API_HOST, DEBUG
+from core.server import serve
 
 if __name__ == "__main__":
-    uvicorn.run(
-        app="api:api",
-        host=API_HOST,
-        port=API_PORT,
-        reload=True,
-        workers=1,
-    )
+    if DEBUG:
+        uvicorn.run(
+            app="api:api",
+            host=API_HOST,
+            port=API_PORT,
+            reload=True,
+            workers=1,
+        )
+    else:
+        serve(app="api:api", host=API_HOST, port=API_PORT)
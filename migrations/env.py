@@ -10,6 +10,8 @@ from alembic import context
 
 from core.db import Base
 from app.models.user import User
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
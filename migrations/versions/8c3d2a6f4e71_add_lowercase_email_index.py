@@ -0,0 +1,35 @@
+"""Normalize emails to lowercase and add unique lower(email) index
+
+Revision ID: 8c3d2a6f4e71
+Revises: 5b1e7f3c9a2d
+Create Date: 2026-10-18 16:21:47.902315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c3d2a6f4e71"
+down_revision: Union[str, None] = "5b1e7f3c9a2d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fails on the users_email_key constraint if two accounts differ only in
+    # the case of their email; such accounts have to be merged by hand first.
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.create_index(
+        "ix_users_email_lower",
+        "users",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
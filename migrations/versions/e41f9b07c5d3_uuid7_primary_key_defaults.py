@@ -0,0 +1,71 @@
+"""Generate time-ordered UUIDv7 primary keys on the server
+
+Revision ID: e41f9b07c5d3
+Revises: 8c3d2a6f4e71
+Create Date: 2026-10-18 16:48:05.117482
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e41f9b07c5d3"
+down_revision: Union[str, None] = "8c3d2a6f4e71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("users", "refresh_tokens", "revoked_tokens")
+
+
+def upgrade() -> None:
+    # The application generates UUIDv7 ids itself (core.db.uuid7); the server
+    # default covers rows inserted outside the ORM. Existing ids are kept:
+    # user ids are embedded in issued tokens and referenced by refresh_tokens.
+    # New v7 ids are ordered among themselves but do not sort after the
+    # random v4 ids: today they start with 01..., below most existing keys.
+    # Inserts go to one narrow, growing key range inside the index instead
+    # of random pages; `REINDEX INDEX CONCURRENTLY users_pkey` compacts the
+    # pages split by earlier random inserts.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(
+                    set_bit(
+                        overlay(
+                            uuid_send(gen_random_uuid())
+                            PLACING substring(
+                                int8send(
+                                    floor(
+                                        extract(epoch FROM clock_timestamp()) * 1000
+                                    )::bigint
+                                ) FROM 3
+                            )
+                            FROM 1 FOR 6
+                        ),
+                        52, 1
+                    ),
+                    53, 1
+                ),
+                'hex'
+            )::uuid
+        $$ LANGUAGE sql VOLATILE
+        """
+    )
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=sa.text("uuid_generate_v7()"))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=None)
+    op.execute("DROP FUNCTION uuid_generate_v7()")
@@ -0,0 +1,33 @@
+"""Drop the plain unique constraint on users.email
+
+Revision ID: f2a8c61d9b47
+Revises: e41f9b07c5d3
+Create Date: 2026-10-18 17:02:31.584210
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a8c61d9b47"
+down_revision: Union[str, None] = "e41f9b07c5d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Emails are stored lowercased and ix_users_email_lower enforces
+    # uniqueness, so users_email_key only adds a second unique index to
+    # maintain on every insert.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_constraint("users_email_key", "users", type_="unique")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.create_unique_constraint("users_email_key", "users", ["email"])